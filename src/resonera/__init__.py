@@ -2,9 +2,11 @@
 Resonera - Neural Entrainment Platform
 Core initialization module
 """
+import os
 from flask import Flask
 from flask_jwt_extended import JWTManager
 from .database import init_db
+from .core.blocklist import blocklist
 from .core.config import Config
 
 def create_app(config_class=Config):
@@ -12,6 +14,9 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Create the audio upload directory if it doesn't exist
+    os.makedirs(app.config['AUDIO_UPLOAD_FOLDER'], exist_ok=True)
+    
     # Configure logging
     import logging
     logging.basicConfig(level=logging.INFO)
@@ -21,6 +26,12 @@ def create_app(config_class=Config):
     
     # Initialize extensions
     jwt = JWTManager(app)
+    blocklist.init_app(app)
+    
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return blocklist.is_revoked(jwt_payload['jti'])
+    
     app.logger.info("JWT Manager initialized")
     
     # Initialize database
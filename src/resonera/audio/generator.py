@@ -1,14 +1,289 @@
 """
 Audio generation for neural entrainment.
 """
+import functools
+import hashlib
+import math
 import numpy as np
-from scipy.io import wavfile
+from numba import cuda, njit, prange, types
 import os
+import struct
+import time
+import wave
 from flask import current_app
 from tempfile import NamedTemporaryFile
 from .transitions import FrequencyTransition
 from .harmonics import HarmonicOvertoneGenerator
 
+
+def _ensure(audio: np.ndarray) -> np.ndarray:
+    """
+    Return audio as a C-contiguous float32 array, copying only if needed.
+    
+    Every audio array returned by AudioGenerator or passed to one of its
+    Numba kernels has this layout, so the kernels only ever see stride-1
+    float32 input and compile a single specialization.
+    """
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def _check_buffers(*buffers: np.ndarray) -> None:
+    """
+    Raise ValueError unless every output buffer is C-contiguous float32.
+    
+    Output buffers are written in place, so unlike inputs they cannot be
+    coerced with _ensure.
+    """
+    for buffer in buffers:
+        if buffer.dtype != np.float32 or not buffer.flags['C_CONTIGUOUS']:
+            raise ValueError("Audio buffers must be C-contiguous float32 arrays")
+
+
+# Array types for the explicit kernel signatures; audio is float32[::1] (see _ensure)
+_f32 = types.float32[::1]
+_f64 = types.float64[::1]
+_f32_ro = types.Array(types.float32, 1, 'C', readonly=True)  # cached ramps and curves
+_i16x2 = types.int16[:, ::1]
+
+
+# Samples generated by the sine recurrence before re-seeding from an exact sin
+_RESEED_INTERVAL = 1 << 16
+
+
+@njit(types.void(types.float64, types.int64, types.float64, _f32),
+      parallel=True, fastmath=True, cache=True)
+def _sine_recurrence(frequency, sample_rate, volume, out):
+    """
+    Fill out with a sine wave at the given frequency, scaled by volume.
+    
+    Uses s[n+1] = 2*cos(w)*s[n] - s[n-1], one multiply and one subtract per
+    sample. Blocks of _RESEED_INTERVAL samples are seeded from an exact sin
+    to bound drift and are generated in parallel.
+    """
+    num_samples = out.shape[0]
+    omega = 2.0 * math.pi * frequency / sample_rate
+    k = 2.0 * math.cos(omega)
+    num_blocks = (num_samples + _RESEED_INTERVAL - 1) // _RESEED_INTERVAL
+    for block in prange(num_blocks):
+        start = block * _RESEED_INTERVAL
+        stop = min(start + _RESEED_INTERVAL, num_samples)
+        s0 = math.sin(omega * (start - 1))
+        s1 = math.sin(omega * start)
+        for i in range(start, stop):
+            out[i] = volume * s1
+            s2 = k * s1 - s0
+            s0 = s1
+            s1 = s2
+
+
+@njit(types.void(_f32, types.float64, types.int64, _f32),
+      parallel=True, fastmath=True, cache=True)
+def _isochronic_njit(carrier, frequency, sample_rate, out):
+    """Fill out with carrier amplitude-modulated by a raised sine envelope."""
+    num_samples = out.shape[0]
+    omega = 2.0 * math.pi * frequency / sample_rate
+    k = 2.0 * math.cos(omega)
+    num_blocks = (num_samples + _RESEED_INTERVAL - 1) // _RESEED_INTERVAL
+    for block in prange(num_blocks):
+        start = block * _RESEED_INTERVAL
+        stop = min(start + _RESEED_INTERVAL, num_samples)
+        s0 = math.sin(omega * (start - 1))
+        s1 = math.sin(omega * start)
+        for i in range(start, stop):
+            out[i] = carrier[i] * 0.5 * (1.0 + s1)
+            s2 = k * s1 - s0
+            s0 = s1
+            s1 = s2
+
+
+@njit(types.void(_f32_ro, _f64, types.float64, types.int64, types.float64,
+                 _f32, _f32, _f32),
+      fastmath=True, cache=True)
+def _transition_njit(freq_curve, carrier_curve, carrier_frequency, sample_rate,
+                     volume, left, right, isochronic):
+    """
+    Render a frequency sweep, integrating each oscillator's instantaneous
+    frequency into its phase and writing volume-scaled samples directly.
+    """
+    phase_step = 2.0 * math.pi / sample_rate
+    carrier_omega = phase_step * carrier_frequency
+    iso_volume = 0.5 * volume
+    left_phase = 0.0
+    right_phase = 0.0
+    modulation_phase = 0.0
+    for i in range(freq_curve.shape[0]):
+        left_phase += carrier_curve[i] * phase_step
+        right_phase += (carrier_curve[i] + freq_curve[i]) * phase_step
+        modulation_phase += freq_curve[i] * phase_step
+        left[i] = volume * math.sin(left_phase)
+        right[i] = volume * math.sin(right_phase)
+        # Isochronic tone keeps a fixed carrier with a swept modulation envelope
+        isochronic[i] = (iso_volume * math.sin(carrier_omega * i)
+                         * (1.0 + math.sin(modulation_phase)))
+
+
+@njit(types.void(_f64, _f64, types.int64, types.int64, types.int64, types.int64, _f32),
+      fastmath=True, cache=True)
+def _add_partials(frequencies, amplitudes, sample_rate, offset, start, stop, out):
+    """
+    Add a sum of sinusoids to out[start:stop] using the sine recurrence,
+    where out[0] is sample offset of the signal.
+    """
+    for k in range(frequencies.shape[0]):
+        omega = 2.0 * math.pi * frequencies[k] / sample_rate
+        c = 2.0 * math.cos(omega)
+        amplitude = amplitudes[k]
+        s0 = math.sin(omega * (offset + start - 1))
+        s1 = math.sin(omega * (offset + start))
+        for i in range(start, stop):
+            out[i] += amplitude * s1
+            s2 = c * s1 - s0
+            s0 = s1
+            s1 = s2
+
+
+@njit(types.void(_f64, _f64, _f64, _f64, _f64, _f64, types.float64,
+                 types.int64, types.int64, _f32, _f32, _f32),
+      parallel=True, fastmath=True, cache=True)
+def _synthesize_njit(left_freqs, left_amps, right_freqs, right_amps,
+                     carrier_freqs, carrier_amps, frequency, sample_rate,
+                     offset, left, right, isochronic):
+    """
+    Render both binaural channels and the isochronic tone in one pass,
+    starting at sample offset of the signal.
+    
+    Each block of _RESEED_INTERVAL samples is produced by one thread while
+    it is still in cache: the partial tables are summed into left, right and
+    isochronic, then the isochronic carrier is modulated in place.
+    """
+    num_samples = left.shape[0]
+    omega = 2.0 * math.pi * frequency / sample_rate
+    k = 2.0 * math.cos(omega)
+    num_blocks = (num_samples + _RESEED_INTERVAL - 1) // _RESEED_INTERVAL
+    for block in prange(num_blocks):
+        start = block * _RESEED_INTERVAL
+        stop = min(start + _RESEED_INTERVAL, num_samples)
+        for i in range(start, stop):
+            left[i] = 0.0
+            right[i] = 0.0
+            isochronic[i] = 0.0
+        _add_partials(left_freqs, left_amps, sample_rate, offset, start, stop, left)
+        _add_partials(right_freqs, right_amps, sample_rate, offset, start, stop, right)
+        _add_partials(carrier_freqs, carrier_amps, sample_rate, offset, start, stop, isochronic)
+        
+        s0 = math.sin(omega * (offset + start - 1))
+        s1 = math.sin(omega * (offset + start))
+        for i in range(start, stop):
+            isochronic[i] *= 0.5 * (1.0 + s1)
+            s2 = k * s1 - s0
+            s0 = s1
+            s1 = s2
+
+
+@cuda.jit(fastmath=True)
+def _synthesize_cuda_kernel(left_freqs, left_amps, right_freqs, right_amps,
+                            carrier_freqs, carrier_amps, frequency, sample_rate,
+                            offset, left, right, isochronic):
+    """
+    CUDA counterpart of _synthesize_njit with one thread per sample.
+    
+    Threads evaluate each partial with an exact sin of a float64 phase, so no
+    recurrence state is shared and long sessions stay phase-accurate.
+    """
+    i = cuda.grid(1)
+    if i >= left.shape[0]:
+        return
+    phase_step = 2.0 * math.pi * (i + offset) / sample_rate
+    
+    value = 0.0
+    for k in range(left_freqs.shape[0]):
+        value += left_amps[k] * math.sin(phase_step * left_freqs[k])
+    left[i] = value
+    
+    value = 0.0
+    for k in range(right_freqs.shape[0]):
+        value += right_amps[k] * math.sin(phase_step * right_freqs[k])
+    right[i] = value
+    
+    value = 0.0
+    for k in range(carrier_freqs.shape[0]):
+        value += carrier_amps[k] * math.sin(phase_step * carrier_freqs[k])
+    isochronic[i] = value * 0.5 * (1.0 + math.sin(phase_step * frequency))
+
+
+# Threads per block for the CUDA kernels
+_CUDA_THREADS_PER_BLOCK = 256
+
+
+@njit(types.float64(types.int64, types.int64, _f32_ro, _f32_ro), cache=True)
+def _fade_gain(i, num_samples, fade_in, fade_out):
+    """Return the fade envelope gain for sample i."""
+    gain = 1.0
+    if i < fade_in.shape[0]:
+        gain *= fade_in[i]
+    tail = i - (num_samples - fade_out.shape[0])
+    if tail >= 0:
+        gain *= fade_out[tail]
+    return gain
+
+
+@njit(types.float64(_f32, _f32, _f32_ro, _f32_ro),
+      parallel=True, fastmath=True, cache=True)
+def _peak_njit(left, right, fade_in, fade_out):
+    """Return the peak absolute amplitude of both faded channels in one pass."""
+    num_samples = left.shape[0]
+    peak = 0.0
+    for i in prange(num_samples):
+        gain = _fade_gain(i, num_samples, fade_in, fade_out)
+        peak = max(peak, max(abs(left[i]), abs(right[i])) * gain)
+    return peak
+
+
+@njit(types.void(_f32, _f32, _f32_ro, _f32_ro, types.float64, types.int64,
+                 types.int64, _i16x2),
+      parallel=True, fastmath=True, cache=True)
+def _finalize_njit(left, right, fade_in, fade_out, scale, offset, num_samples, out):
+    """
+    Apply fades and scaling to a block of samples beginning at sample offset
+    of a num_samples signal and write it to out as interleaved 16-bit stereo.
+    """
+    for j in prange(out.shape[0]):
+        gain = _fade_gain(offset + j, num_samples, fade_in, fade_out) * scale
+        out[j, 0] = np.int16(left[j] * gain)
+        out[j, 1] = np.int16(right[j] * gain)
+
+
+# Longest sine kept by _unit_sine (about 24 s at 44.1 kHz, 4 MB as float32)
+_SINE_CACHE_MAX_SAMPLES = 1 << 20
+
+
+@functools.lru_cache(maxsize=16)
+def _unit_sine(frequency: float, num_samples: int, sample_rate: int) -> np.ndarray:
+    """Return a cached, read-only unit-amplitude sine wave."""
+    wave = np.empty(num_samples, dtype=np.float32)
+    _sine_recurrence(frequency, sample_rate, 1.0, wave)
+    wave.setflags(write=False)
+    return wave
+
+
+@functools.lru_cache(maxsize=8)
+def _fade_ramps(fade_length: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return cached, read-only (fade_in, fade_out) ramps."""
+    fade_in = np.linspace(0, 1, fade_length, dtype=np.float32)
+    fade_out = np.linspace(1, 0, fade_length, dtype=np.float32)
+    fade_in.setflags(write=False)
+    fade_out.setflags(write=False)
+    return fade_in, fade_out
+
+
+@functools.lru_cache(maxsize=8)
+def _crossfade_ramp(length: int) -> np.ndarray:
+    """Return a cached, read-only raised-cosine ramp rising from 0 towards 1."""
+    ramp = (0.5 - 0.5 * np.cos(np.pi * (np.arange(length) + 0.5) / length)).astype(np.float32)
+    ramp.setflags(write=False)
+    return ramp
+
+
 class AudioGenerator:
     """Generates neural entrainment audio using binaural beats and isochronic tones."""
     
@@ -20,13 +295,46 @@ class AudioGenerator:
         'gamma': (30.0, 100.0)  # High-level cognition
     }
     
-    def __init__(self):
-        """Initialize the audio generator with default parameters."""
+    # Carrier for each band, looked up by the target's position among the band edges
+    CARRIER_BAND_EDGES = np.array([4.0, 8.0, 14.0])  # Upper bounds of delta, theta, alpha
+    CARRIER_FREQUENCIES = np.array([100.0, 200.0, 440.0, 500.0])
+    
+    # Synthesis backends accepted by __init__
+    BACKENDS = ('cpu', 'cuda')
+    
+    # Part of every cached render's key; bump whenever synthesis output changes
+    RENDER_CACHE_VERSION = 1
+    # Total size of cached renders kept per output directory (three hour-long sessions)
+    RENDER_CACHE_MAX_BYTES = 2 * 1024 ** 3
+    
+    def __init__(self, backend: str = 'cpu'):
+        """
+        Initialize the audio generator with default parameters.
+        
+        Args:
+            backend: 'cpu' or 'cuda'. The CUDA backend falls back to the CPU
+                when no CUDA device is available.
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        if backend == 'cuda' and not cuda.is_available():
+            backend = 'cpu'
+        self.backend = backend
+        
         self.sample_rate = 44100  # Standard audio sample rate
         self.carrier_frequency = 440  # Base frequency for binaural beats (Hz)
         self.transition = FrequencyTransition(sample_rate=self.sample_rate)
         self.harmonic_generator = HarmonicOvertoneGenerator(sample_rate=self.sample_rate)
         
+        # Default 0.1 s fade envelopes, built once per generator
+        self._fade_in, self._fade_out = _fade_ramps(self._n_samples(0.1))
+        # 10 ms crossfade from a transition into the fixed-frequency audio
+        self._junction_length = self._n_samples(0.01)
+    
+    def _n_samples(self, duration: float) -> int:
+        """Return the number of samples in duration seconds of audio."""
+        return int(self.sample_rate * duration)
+        
     def get_optimal_carrier_frequency(self, target_frequency: float) -> float:
         """
         Calculate optimal carrier frequency based on target frequency.
@@ -47,6 +355,19 @@ class AudioGenerator:
         else:  # Gamma
             return 500.0  # Higher carrier for gamma frequencies
     
+    def _carriers_vec(self, target_frequencies: np.ndarray) -> np.ndarray:
+        """
+        Vectorized get_optimal_carrier_frequency for an array of targets.
+        
+        Args:
+            target_frequencies: Desired entrainment frequencies
+            
+        Returns:
+            numpy.ndarray: Optimal carrier frequency for each target
+        """
+        bands = np.searchsorted(self.CARRIER_BAND_EDGES, target_frequencies)
+        return self.CARRIER_FREQUENCIES[bands]
+    
     def generate_sine_wave(self, frequency: float, duration: float,
                           volume: float = 0.7) -> np.ndarray:
         """
@@ -60,12 +381,19 @@ class AudioGenerator:
         Returns:
             numpy.ndarray: Audio samples
         """
-        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
-        sine_wave = np.sin(2 * np.pi * frequency * t)
-        return sine_wave * volume
+        num_samples = self._n_samples(duration)
+        
+        # Short clips reuse a cached unit sine and only pay for the volume scaling
+        if num_samples <= _SINE_CACHE_MAX_SAMPLES:
+            return _unit_sine(frequency, num_samples, self.sample_rate) * volume
+        
+        sine_wave = np.empty(num_samples, dtype=np.float32)
+        _sine_recurrence(frequency, self.sample_rate, volume, sine_wave)
+        return sine_wave
     
     def generate_binaural_beat(self, target_frequency: float, duration: float,
-                              volume: float = 0.7) -> tuple[np.ndarray, np.ndarray]:
+                              volume: float = 0.7,
+                              out=None) -> tuple[np.ndarray, np.ndarray]:
         """
         Generate binaural beat using two slightly different frequencies with harmonic enhancement.
         
@@ -73,9 +401,13 @@ class AudioGenerator:
             target_frequency: Desired beat frequency in Hz
             duration: Duration in seconds
             volume: Volume level (0-1)
+            out: Optional (2, N) array, or pair of N-sample buffers, to render
+                the left and right channels into; each channel must be
+                C-contiguous float32
             
         Returns:
-            tuple: (left_channel, right_channel) audio samples
+            tuple: (left_channel, right_channel) audio samples, the two rows
+                of a single (2, N) buffer unless out is given
         """
         # Get optimal carrier frequency for the target frequency
         carrier = self.get_optimal_carrier_frequency(target_frequency)
@@ -84,9 +416,23 @@ class AudioGenerator:
         left_freq = carrier
         right_freq = carrier + target_frequency
         
-        # Generate enhanced carrier waves with harmonics
-        left_channel = self.harmonic_generator.generate_enhanced_frequency(left_freq, duration, volume)
-        right_channel = self.harmonic_generator.generate_enhanced_frequency(right_freq, duration, volume)
+        # Render both enhanced carrier waves straight into the rows of one
+        # stereo buffer; rows stay contiguous for the kernels and the WAV
+        # writer interleaves them while quantizing
+        num_samples = self._n_samples(duration)
+        if out is None:
+            out = np.empty((2, num_samples), dtype=np.float32)
+        left_channel, right_channel = out
+        _check_buffers(left_channel, right_channel)
+        if len(left_channel) != num_samples or len(right_channel) != num_samples:
+            raise ValueError(f"Binaural output buffers must hold {num_samples} samples")
+        
+        self.harmonic_generator.generate_enhanced_frequency(
+            left_freq, duration, volume, out=left_channel
+        )
+        self.harmonic_generator.generate_enhanced_frequency(
+            right_freq, duration, volume, out=right_channel
+        )
         
         return left_channel, right_channel
     
@@ -104,14 +450,146 @@ class AudioGenerator:
             numpy.ndarray: Audio samples
         """
         # Generate enhanced carrier wave with harmonics
-        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
-        carrier = self.harmonic_generator.generate_enhanced_frequency(self.carrier_frequency, duration, volume)
+        carrier = _ensure(self.harmonic_generator.generate_enhanced_frequency(
+            self.carrier_frequency, duration, volume, dtype=np.float32
+        ))
+        
+        # Apply modulation envelope in a single pass
+        tone = np.empty(len(carrier), dtype=np.float32)
+        _isochronic_njit(carrier, frequency, self.sample_rate, tone)
+        return tone
+    
+    def _generate_transition(self, freq_curve: np.ndarray, volume: float,
+                             left: np.ndarray, right: np.ndarray,
+                             isochronic: np.ndarray) -> None:
+        """
+        Generate binaural and isochronic audio following a frequency curve.
+        
+        The curve holds one target frequency per sample, so each oscillator's
+        phase is the running sum of its instantaneous frequency. This keeps the
+        sweep phase-continuous and renders it in a single compiled pass.
+        
+        Args:
+            freq_curve: Target frequency in Hz for each sample
+            volume: Volume level (0-1)
+            left: Output buffer for the left binaural channel
+            right: Output buffer for the right binaural channel
+            isochronic: Output buffer for the isochronic tone
+        """
+        _check_buffers(left, right, isochronic)
+        freq_curve = _ensure(freq_curve)
+        carrier_curve = self._carriers_vec(freq_curve)
+        _transition_njit(freq_curve, carrier_curve, self.carrier_frequency,
+                         self.sample_rate, volume, left, right, isochronic)
+    
+    def _partial_tables(self, frequency: float, volume: float) -> tuple:
+        """
+        Return the (frequencies, amplitudes) partial tables of the left and
+        right binaural channels and the isochronic carrier at a fixed
+        target frequency.
+        """
+        carrier = self.get_optimal_carrier_frequency(frequency)
+        return (self.harmonic_generator.enhanced_table(carrier, volume),
+                self.harmonic_generator.enhanced_table(carrier + frequency, volume),
+                self.harmonic_generator.enhanced_table(self.carrier_frequency, volume))
+    
+    @staticmethod
+    def _needs_normalization(tables: tuple) -> bool:
+        """Return whether any partial table can exceed full scale on its own."""
+        return max(amplitudes.sum() for _, amplitudes in tables) > 1
+    
+    @staticmethod
+    def _peak_bound(tables: tuple) -> float:
+        """
+        Return an upper bound on the peak of each binaural channel plus the
+        isochronic tone, from the partial amplitudes.
+        """
+        left_sum, right_sum, iso_sum = (amplitudes.sum() for _, amplitudes in tables)
+        # Each signal is bounded by its amplitude sum, or by 1 once normalized,
+        # and the isochronic envelope never exceeds 1
+        return float(max(min(left_sum, 1.0), min(right_sum, 1.0)) + min(iso_sum, 1.0))
+    
+    def _synthesize_all(self, frequency: float, duration: float, volume: float,
+                        left: np.ndarray, right: np.ndarray,
+                        isochronic: np.ndarray) -> float:
+        """
+        Generate binaural beat and isochronic tone at a fixed frequency into
+        the given buffers, sharing one fused pass over the samples.
+        
+        Equivalent to generate_binaural_beat plus generate_isochronic_tone.
+        When the harmonic partials could exceed full scale, those methods
+        normalize by the rendered peak, so they are used directly instead.
+        
+        Args:
+            frequency: Target frequency in Hz
+            duration: Duration in seconds
+            volume: Volume level (0-1)
+            left: Output buffer for the left binaural channel
+            right: Output buffer for the right binaural channel
+            isochronic: Output buffer for the isochronic tone
+            
+        Returns:
+            float: Upper bound on the peak of each binaural channel plus the
+                isochronic tone, from the partial amplitudes
+        """
+        _check_buffers(left, right, isochronic)
+        tables = self._partial_tables(frequency, volume)
+        if self._needs_normalization(tables):
+            self.generate_binaural_beat(frequency, duration, volume, out=(left, right))
+            isochronic[:] = self.generate_isochronic_tone(frequency, duration, volume)
+        else:
+            self._synthesize_fused(tables, frequency, 0, left, right, isochronic)
+        return self._peak_bound(tables)
+    
+    def _synthesize_fused(self, tables: tuple, frequency: float, offset: int,
+                          left: np.ndarray, right: np.ndarray,
+                          isochronic: np.ndarray) -> None:
+        """
+        Run the fused synthesis of the given partial tables into the buffers,
+        which start at sample offset of the fixed-frequency signal.
+        """
+        (left_freqs, left_amps), (right_freqs, right_amps), (iso_freqs, iso_amps) = tables
+        if self.backend == 'cuda':
+            self._synthesize_cuda(left_freqs, left_amps, right_freqs, right_amps,
+                                  iso_freqs, iso_amps, frequency, offset,
+                                  left, right, isochronic)
+        else:
+            _synthesize_njit(left_freqs, left_amps, right_freqs, right_amps,
+                             iso_freqs, iso_amps, frequency, self.sample_rate,
+                             offset, left, right, isochronic)
+    
+    def _synthesize_cuda(self, left_freqs, left_amps, right_freqs, right_amps,
+                         iso_freqs, iso_amps, frequency: float, offset: int,
+                         left: np.ndarray, right: np.ndarray,
+                         isochronic: np.ndarray) -> None:
+        """
+        Run the fused synthesis on the GPU and copy each output back once.
         
-        # Generate modulation envelope
-        modulation = 0.5 * (1 + np.sin(2 * np.pi * frequency * t))
+        Args:
+            left_freqs, left_amps: Partial table for the left channel
+            right_freqs, right_amps: Partial table for the right channel
+            iso_freqs, iso_amps: Partial table for the isochronic carrier
+            frequency: Isochronic modulation frequency in Hz
+            offset: Sample of the signal the buffers start at
+            left: Output buffer for the left binaural channel
+            right: Output buffer for the right binaural channel
+            isochronic: Output buffer for the isochronic tone
+        """
+        num_samples = len(left)
+        stream = cuda.stream()
+        tables = [cuda.to_device(np.ascontiguousarray(table), stream=stream)
+                  for table in (left_freqs, left_amps, right_freqs, right_amps,
+                                iso_freqs, iso_amps)]
+        outputs = [cuda.device_array(num_samples, dtype=np.float32, stream=stream)
+                   for _ in range(3)]
         
-        # Apply modulation
-        return carrier * modulation
+        blocks = (num_samples + _CUDA_THREADS_PER_BLOCK - 1) // _CUDA_THREADS_PER_BLOCK
+        _synthesize_cuda_kernel[blocks, _CUDA_THREADS_PER_BLOCK, stream](
+            *tables, frequency, self.sample_rate, offset, *outputs
+        )
+        for device_array, host_array in zip(outputs, (left, right, isochronic)):
+            device_array.copy_to_host(host_array, stream=stream)
+        stream.synchronize()
     
     def apply_fade(self, audio: np.ndarray, fade_duration: float = 0.1) -> np.ndarray:
         """
@@ -124,126 +602,388 @@ class AudioGenerator:
         Returns:
             numpy.ndarray: Audio with fades applied
         """
-        fade_length = int(fade_duration * self.sample_rate)
-        fade_in = np.linspace(0, 1, fade_length)
-        fade_out = np.linspace(1, 0, fade_length)
+        fade_length = self._n_samples(fade_duration)
+        if fade_length == len(self._fade_in):
+            fade_in, fade_out = self._fade_in, self._fade_out
+        else:
+            fade_in, fade_out = _fade_ramps(fade_length)
         
         audio[:fade_length] *= fade_in
         audio[-fade_length:] *= fade_out
         
         return audio
     
-    def generate(self, frequency: float, duration: float,
-                volume: float = 0.7, transition_type: str = 'sigmoid') -> str:
+    def _transition_curve(self, frequency: float, duration: float,
+                          transition_type: str,
+                          previous_frequency: float | None) -> tuple[np.ndarray | None, float]:
         """
-        Generate complete neural entrainment audio file.
+        Work out the sweep from the previous session's frequency.
+        
+        Returns:
+            tuple: (freq_curve, remaining_duration) where freq_curve holds the
+                target frequency of each transition sample, or None if no
+                transition is needed, and remaining_duration is the time left
+                at the target frequency
+        """
+        if previous_frequency is None or previous_frequency == frequency:
+            return None, duration
+        
+        # Calculate optimal transition duration
+        transition_duration = self.transition.calculate_optimal_duration(
+            previous_frequency, frequency
+        )
+        transition_duration = min(transition_duration, duration / 4)  # Max 25% of total duration
+        
+        # Generate transition frequencies
+        if transition_type == 'linear':
+            freq_curve = self.transition.linear_transition(
+                previous_frequency, frequency, transition_duration
+            )
+        elif transition_type == 'exponential':
+            freq_curve = self.transition.exponential_transition(
+                previous_frequency, frequency, transition_duration
+            )
+        else:  # default to sigmoid
+            freq_curve = self.transition.sigmoid_transition(
+                previous_frequency, frequency, transition_duration
+            )
+        return freq_curve, max(duration - transition_duration, 0)
+    
+    def _render_sweep(self, freq_curve: np.ndarray, frequency: float, volume: float,
+                      remaining_samples: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Render a transition with its isochronic tone mixed into both channels.
+        
+        The sweep keeps running at the target frequency for up to one
+        junction crossfade past its end, phase-continuously, so the
+        fixed-frequency audio can be crossfaded in over those samples
+        instead of starting with a jump in phase and timbre.
         
         Args:
+            freq_curve: Target frequency in Hz for each transition sample
             frequency: Target frequency in Hz
-            duration: Duration in seconds
             volume: Volume level (0-1)
+            remaining_samples: Length of the fixed-frequency audio that follows
             
         Returns:
-            str: Path to generated audio file
+            tuple: (left, right) channels, running past the transition into
+                the overlap with the fixed-frequency audio
         """
-        # Generate frequency transition if needed
-        if hasattr(self, '_last_frequency') and self._last_frequency != frequency:
-            # Calculate optimal transition duration
-            transition_duration = self.transition.calculate_optimal_duration(
-                self._last_frequency, frequency
-            )
-            transition_duration = min(transition_duration, duration / 4)  # Max 25% of total duration
-            
-            # Generate transition frequencies
-            if transition_type == 'linear':
-                freq_curve = self.transition.linear_transition(
-                    self._last_frequency, frequency, transition_duration
-                )
-            elif transition_type == 'exponential':
-                freq_curve = self.transition.exponential_transition(
-                    self._last_frequency, frequency, transition_duration
-                )
-            else:  # default to sigmoid
-                freq_curve = self.transition.sigmoid_transition(
-                    self._last_frequency, frequency, transition_duration
-                )
-            
-            # Generate transition audio
-            left_binaural = np.array([])
-            right_binaural = np.array([])
-            isochronic = np.array([])
-            
-            # Generate audio for each frequency step
-            for freq in freq_curve:
-                left_step, right_step = self.generate_binaural_beat(
-                    freq, 1/self.sample_rate, volume * 0.5
-                )
-                iso_step = self.generate_isochronic_tone(
-                    freq, 1/self.sample_rate, volume * 0.5
-                )
-                
-                left_binaural = np.append(left_binaural, left_step)
-                right_binaural = np.append(right_binaural, right_step)
-                isochronic = np.append(isochronic, iso_step)
-            
-            # Generate remaining duration at target frequency
-            remaining_duration = duration - transition_duration
-            if remaining_duration > 0:
-                left_main, right_main = self.generate_binaural_beat(
-                    frequency, remaining_duration, volume * 0.5
-                )
-                iso_main = self.generate_isochronic_tone(
-                    frequency, remaining_duration, volume * 0.5
-                )
-                
-                left_binaural = np.append(left_binaural, left_main)
-                right_binaural = np.append(right_binaural, right_main)
-                isochronic = np.append(isochronic, iso_main)
-        else:
-            # No transition needed
-            left_binaural, right_binaural = self.generate_binaural_beat(
-                frequency, duration, volume * 0.5
+        n_overlap = min(self._junction_length, remaining_samples)
+        freq_curve = np.concatenate((freq_curve, np.full(n_overlap, frequency)))
+        left, right, isochronic = np.empty((3, len(freq_curve)), dtype=np.float32)
+        self._generate_transition(freq_curve, volume, left, right, isochronic)
+        left += isochronic
+        right += isochronic
+        return left, right
+    
+    @staticmethod
+    def _crossfade_junction(channel: np.ndarray, overlap: np.ndarray,
+                            position: int) -> None:
+        """
+        Crossfade in place from the overlapping end of a sweep into
+        fixed-frequency audio.
+        
+        Args:
+            channel: Fixed-frequency samples, starting position samples
+                after the end of the transition
+            overlap: Sweep samples past the end of the transition
+            position: Offset of channel[0] from the end of the transition
+        """
+        stop = min(len(overlap), position + len(channel))
+        if position >= stop:
+            return
+        ramp = _crossfade_ramp(len(overlap))[position:stop]
+        segment = channel[:stop - position]
+        segment *= ramp
+        segment += (1.0 - ramp) * overlap[position:stop]
+    
+    def _render(self, frequency: float, duration: float, volume: float,
+                transition_type: str,
+                previous_frequency: float | None) -> tuple[np.ndarray, np.ndarray, float]:
+        """
+        Synthesize both channels and work out the 16-bit output scale.
+        
+        Returns:
+            tuple: (left channel, right channel, scale) where scale maps the
+                faded float samples to int16 without clipping
+        """
+        # Binaural beats and isochronic tones each contribute half the volume
+        channel_volume = volume * 0.5
+        freq_curve, remaining_duration = self._transition_curve(
+            frequency, duration, transition_type, previous_frequency
+        )
+        
+        # Preallocate the full buffers and fill transition and main regions in place
+        n_transition = 0 if freq_curve is None else len(freq_curve)
+        total_samples = n_transition + self._n_samples(remaining_duration)
+        left_channel = np.empty(total_samples, dtype=np.float32)
+        right_channel = np.empty(total_samples, dtype=np.float32)
+        isochronic = np.empty(total_samples - n_transition, dtype=np.float32)
+        
+        # Generate remaining duration at target frequency
+        peak_bound = 0.0
+        if total_samples > n_transition:
+            peak_bound = self._synthesize_all(
+                frequency, remaining_duration, channel_volume,
+                left_channel[n_transition:],
+                right_channel[n_transition:],
+                isochronic
             )
-            isochronic = self.generate_isochronic_tone(
-                frequency, duration, volume * 0.5
+        
+        # Combine isochronic tones with binaural beats
+        left_channel[n_transition:] += isochronic
+        right_channel[n_transition:] += isochronic
+        
+        if n_transition:
+            # Transition oscillators and the isochronic envelope peak at
+            # channel_volume each; the crossfade stays within both bounds
+            peak_bound = max(peak_bound, 2 * channel_volume)
+            sweep_left, sweep_right = self._render_sweep(
+                freq_curve, frequency, channel_volume, total_samples - n_transition
             )
+            left_channel[:n_transition] = sweep_left[:n_transition]
+            right_channel[:n_transition] = sweep_right[:n_transition]
+            self._crossfade_junction(left_channel[n_transition:], sweep_left[n_transition:], 0)
+            self._crossfade_junction(right_channel[n_transition:], sweep_right[n_transition:], 0)
         
-        # Store current frequency for next transition
-        self._last_frequency = frequency
+        # Normalize to prevent clipping once fades are applied. Audio is only
+        # scaled down when its peak exceeds 1, so the peak scan is skipped
+        # whenever the analytic bound already rules that out
+        if peak_bound <= 1.0:
+            max_amplitude = 1.0
+        else:
+            max_amplitude = _peak_njit(left_channel, right_channel,
+                                       self._fade_in, self._fade_out)
+        return left_channel, right_channel, 32767 / max(max_amplitude, 1.0)
+    
+    def _pcm_blocks(self, left_channel: np.ndarray, right_channel: np.ndarray,
+                    scale: float, block_size: int):
+        """
+        Yield interleaved (L, R) int16 frames one block at a time.
         
-        # Combine isochronic tones with binaural beats
-        left_channel = left_binaural + isochronic
-        right_channel = right_binaural + isochronic
+        A single block buffer is reused, so each yielded view is only valid
+        until the next one is requested.
+        """
+        num_samples = len(left_channel)
+        block = np.empty((max(1, min(block_size, num_samples)), 2), dtype=np.int16, order='C')
+        for start in range(0, num_samples, len(block)):
+            frames = block[:num_samples - start]
+            stop = start + len(frames)
+            _finalize_njit(left_channel[start:stop], right_channel[start:stop],
+                           self._fade_in, self._fade_out, scale, start, num_samples, frames)
+            yield frames
+    
+    def _stream_blocks(self, tables: tuple, frequency: float,
+                       left_transition: np.ndarray, right_transition: np.ndarray,
+                       n_transition: int, scale: float, num_samples: int,
+                       block_size: int):
+        """
+        Yield interleaved (L, R) int16 frames of a session, synthesizing its
+        fixed-frequency part one block at a time.
         
-        # Apply fades
-        left_channel = self.apply_fade(left_channel)
-        right_channel = self.apply_fade(right_channel)
+        The first n_transition samples of the pre-rendered sweep come first;
+        the rest of the sweep is crossfaded into the fixed-frequency audio.
+        As with _pcm_blocks, each yielded view is only valid until the next
+        one is requested.
+        """
+        block_size = max(1, min(block_size, num_samples))
+        block = np.empty((block_size, 2), dtype=np.int16, order='C')
+        for start in range(0, n_transition, block_size):
+            stop = min(start + block_size, n_transition)
+            frames = block[:stop - start]
+            _finalize_njit(left_transition[start:stop], right_transition[start:stop],
+                           self._fade_in, self._fade_out, scale, start, num_samples, frames)
+            yield frames
         
-        # Normalize to prevent clipping
-        max_amplitude = max(np.max(np.abs(left_channel)),
-                          np.max(np.abs(right_channel)))
-        if max_amplitude > 1:
-            left_channel /= max_amplitude
-            right_channel /= max_amplitude
+        left, right, isochronic = np.empty((3, block_size), dtype=np.float32)
+        for start in range(n_transition, num_samples, block_size):
+            count = min(block_size, num_samples - start)
+            left_block, right_block, iso_block = left[:count], right[:count], isochronic[:count]
+            self._synthesize_fused(tables, frequency, start - n_transition,
+                                   left_block, right_block, iso_block)
+            left_block += iso_block
+            right_block += iso_block
+            self._crossfade_junction(left_block, left_transition[n_transition:],
+                                     start - n_transition)
+            self._crossfade_junction(right_block, right_transition[n_transition:],
+                                     start - n_transition)
+            frames = block[:count]
+            _finalize_njit(left_block, right_block, self._fade_in, self._fade_out,
+                           scale, start, num_samples, frames)
+            yield frames
+    
+    def _wav_header(self, num_samples: int) -> bytes:
+        """Return the 44-byte header of a 16-bit stereo PCM WAV file."""
+        data_size = num_samples * 4
+        return struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + data_size, b'WAVE',
+            b'fmt ', 16, 1, 2, self.sample_rate, self.sample_rate * 4, 4, 16,
+            b'data', data_size
+        )
+    
+    def generate(self, frequency: float, duration: float,
+                volume: float = 0.7, transition_type: str = 'sigmoid',
+                previous_frequency: float | None = None,
+                output_dir: str | None = None, cache: bool = False) -> str:
+        """
+        Generate complete neural entrainment audio file.
         
-        # Combine channels
-        stereo_audio = np.vstack((left_channel, right_channel)).T
+        The generator holds no per-session state, so a single instance can be
+        shared by all requests; callers pass the frequency the listener was
+        last entrained at to get a smooth transition.
+        
+        Args:
+            frequency: Target frequency in Hz
+            duration: Duration in seconds
+            volume: Volume level (0-1)
+            transition_type: 'linear', 'exponential' or 'sigmoid'
+            previous_frequency: Frequency of the previous session, if any
+            output_dir: Directory for the file, defaulting to the app's
+                AUDIO_UPLOAD_FOLDER (needed outside an app context)
+            cache: Reuse an earlier render with identical parameters if it
+                is still in output_dir, and keep this one for later calls.
+                The least recently used cached renders are removed once
+                they exceed RENDER_CACHE_MAX_BYTES, so open the returned
+                file promptly.
+            
+        Returns:
+            str: Path to generated audio file
+        """
+        output_dir = output_dir or current_app.config['AUDIO_UPLOAD_FOLDER']
+        if cache:
+            key = hashlib.blake2b(repr((
+                frequency, duration, volume, transition_type, previous_frequency,
+                self.sample_rate, self.RENDER_CACHE_VERSION
+            )).encode(), digest_size=16).hexdigest()
+            cached_path = os.path.join(output_dir, f'render_{key}.wav')
+            try:
+                # Touching a hit marks it as recently used
+                os.utime(cached_path)
+                return cached_path
+            except FileNotFoundError:
+                pass
+        
+        left_channel, right_channel, scale = self._render(
+            frequency, duration, volume, transition_type, previous_frequency
+        )
         
         # Save to temporary file
         temp_file = NamedTemporaryFile(
             suffix='.wav',
-            dir=current_app.config['AUDIO_UPLOAD_FOLDER'],
+            dir=output_dir,
             delete=False
         )
         
-        # Convert to 16-bit PCM
-        audio_16bit = (stereo_audio * 32767).astype(np.int16)
-        
-        # Save WAV file
-        wavfile.write(temp_file.name, self.sample_rate, audio_16bit)
+        # Write 16-bit PCM one block at a time so only a single block of
+        # interleaved frames is ever held in memory
+        with temp_file, wave.open(temp_file, 'wb') as wav_file:
+            wav_file.setnchannels(2)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            for frames in self._pcm_blocks(left_channel, right_channel, scale,
+                                           self.sample_rate):
+                wav_file.writeframes(frames)
         
+        if cache:
+            # Publish atomically so readers never see a partly written file
+            os.replace(temp_file.name, cached_path)
+            self._prune_render_cache(output_dir)
+            return cached_path
         return temp_file.name
     
+    def _prune_render_cache(self, output_dir: str) -> None:
+        """
+        Remove the least recently used cached renders in output_dir until
+        the rest fit in RENDER_CACHE_MAX_BYTES. The newest is always kept.
+        """
+        renders = []
+        with os.scandir(output_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('render_') and entry.name.endswith('.wav'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # Removed by a concurrent prune
+                    renders.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        renders.sort(reverse=True)
+        total_size = 0
+        for index, (_, size, path) in enumerate(renders):
+            total_size += size
+            if index and total_size > self.RENDER_CACHE_MAX_BYTES:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # Already removed by a concurrent prune
+    
+    def generate_iter(self, frequency: float, duration: float,
+                      volume: float = 0.7, transition_type: str = 'sigmoid',
+                      previous_frequency: float | None = None,
+                      chunk_sec: float = 0.5):
+        """
+        Generate neural entrainment audio as a stream of WAV bytes.
+        
+        The returned iterator yields the WAV header followed by little-endian
+        16-bit PCM chunks of chunk_sec seconds each, without touching the
+        disk. Any transition is rendered before this returns, and the rest
+        is synthesized one chunk at a time as the iterator is consumed, so
+        the first bytes are ready at once and only a chunk of audio is held
+        in memory; errors in those chunks surface mid-stream.
+        
+        Audio is scaled by the analytic peak bound rather than the rendered
+        peak, so it can come out slightly quieter than the file from
+        generate when that bound exceeds full scale. When a single partial
+        table could exceed full scale it has to be normalized by its
+        rendered peak, so the whole session is then rendered up front.
+        
+        Args:
+            frequency: Target frequency in Hz
+            duration: Duration in seconds
+            volume: Volume level (0-1)
+            transition_type: 'linear', 'exponential' or 'sigmoid'
+            previous_frequency: Frequency of the previous session, if any
+            chunk_sec: Length of each yielded chunk in seconds
+            
+        Returns:
+            Iterator[bytes]: WAV file contents
+        """
+        block_size = max(1, self._n_samples(chunk_sec))
+        channel_volume = volume * 0.5
+        freq_curve, remaining_duration = self._transition_curve(
+            frequency, duration, transition_type, previous_frequency
+        )
+        tables = self._partial_tables(frequency, channel_volume)
+        n_transition = 0 if freq_curve is None else len(freq_curve)
+        num_samples = n_transition + self._n_samples(remaining_duration)
+        
+        if self._needs_normalization(tables):
+            left_channel, right_channel, scale = self._render(
+                frequency, duration, volume, transition_type, previous_frequency
+            )
+            blocks = self._pcm_blocks(left_channel, right_channel, scale, block_size)
+        else:
+            if n_transition:
+                left_channel, right_channel = self._render_sweep(
+                    freq_curve, frequency, channel_volume, num_samples - n_transition
+                )
+            else:
+                left_channel = right_channel = np.empty(0, dtype=np.float32)
+            # Transition oscillators and the isochronic envelope peak at channel_volume each
+            peak_bound = max(2 * channel_volume if n_transition else 0.0,
+                             self._peak_bound(tables))
+            blocks = self._stream_blocks(tables, frequency, left_channel, right_channel,
+                                         n_transition, 32767 / max(peak_bound, 1.0),
+                                         num_samples, block_size)
+        
+        def chunks():
+            yield self._wav_header(num_samples)
+            for frames in blocks:
+                yield frames.astype('<i2', copy=False).tobytes()
+        
+        return chunks()
+    
     def cleanup_old_files(self, max_age_hours: int = 1):
         """
         Clean up old generated audio files.
@@ -254,12 +994,13 @@ class AudioGenerator:
         audio_dir = current_app.config['AUDIO_UPLOAD_FOLDER']
         current_time = time.time()
         
-        for filename in os.listdir(audio_dir):
-            filepath = os.path.join(audio_dir, filename)
-            if os.path.isfile(filepath):
-                file_age = current_time - os.path.getctime(filepath)
-                if file_age > max_age_hours * 3600:
+        max_age_seconds = max_age_hours * 3600
+        
+        # scandir entries carry cached stat data, avoiding separate isfile/getctime calls
+        with os.scandir(audio_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and current_time - entry.stat().st_ctime > max_age_seconds:
                     try:
-                        os.remove(filepath)
+                        os.remove(entry.path)
                     except OSError:
                         pass  # Ignore errors in cleanup
@@ -1,27 +1,218 @@
 """
 Harmonic relationship calculations and overtone generation for optimal frequency combinations.
 """
+import functools
+import math
 import numpy as np
 import logging
+import threading
+from numba import njit, prange, types
 from typing import List, Tuple, Optional
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Samples generated by the sine recurrence before re-seeding from an exact sin
+_RESEED_INTERVAL = 1 << 16
+
+# Longest time axis kept by _two_pi_t (about 24 s at 44.1 kHz, 8 MB)
+_TIME_AXIS_CACHE_MAX_SAMPLES = 1 << 20
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_two_pi_t(sample_rate: int, duration: float) -> np.ndarray:
+    """Return a cached, read-only 2*pi*t axis."""
+    two_pi_t = 2 * np.pi * np.linspace(0, duration, int(sample_rate * duration), False)
+    two_pi_t.setflags(write=False)
+    return two_pi_t
+
+
+def _two_pi_t(sample_rate: int, duration: float) -> np.ndarray:
+    """
+    Return the time axis scaled by 2*pi, so a partial's phase is freq * axis.
+    
+    Axes up to _TIME_AXIS_CACHE_MAX_SAMPLES long are cached and shared, so
+    they must not be modified.
+    """
+    if int(sample_rate * duration) <= _TIME_AXIS_CACHE_MAX_SAMPLES:
+        return _cached_two_pi_t(sample_rate, duration)
+    return 2 * np.pi * np.linspace(0, duration, int(sample_rate * duration), False)
+
+
+@njit([types.void(types.float64[::1], types.float64[::1], types.float64, types.float32[::1]),
+       types.void(types.float64[::1], types.float64[::1], types.float64, types.float64[::1])],
+      parallel=True, fastmath=True, cache=True)
+def _sum_sines_nb(frequencies, amplitudes, phase_step, out):
+    """
+    Fill out with sum(amplitudes[k] * sin(frequencies[k] * phase_step * i)).
+    
+    Each partial uses s[n+1] = 2*cos(w)*s[n] - s[n-1] instead of a sin per
+    sample. Blocks of _RESEED_INTERVAL samples are seeded from an exact sin
+    to bound drift and are generated in parallel.
+    """
+    num_samples = out.shape[0]
+    num_blocks = (num_samples + _RESEED_INTERVAL - 1) // _RESEED_INTERVAL
+    for block in prange(num_blocks):
+        start = block * _RESEED_INTERVAL
+        stop = min(start + _RESEED_INTERVAL, num_samples)
+        for i in range(start, stop):
+            out[i] = 0.0
+        for k in range(frequencies.shape[0]):
+            omega = frequencies[k] * phase_step
+            c = 2.0 * math.cos(omega)
+            amplitude = amplitudes[k]
+            s0 = math.sin(omega * (start - 1))
+            s1 = math.sin(omega * start)
+            for i in range(start, stop):
+                out[i] += amplitude * s1
+                s2 = c * s1 - s0
+                s0 = s1
+                s1 = s2
+
+
+def _sum_partials(frequencies: np.ndarray, amplitudes: np.ndarray,
+                  sample_rate: int, duration: float,
+                  dtype: np.dtype = np.float32,
+                  out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Return the sum of sinusoids sampled on np.linspace(0, duration, n, False).
+    
+    Args:
+        frequencies: Frequency of each partial in Hz
+        amplitudes: Amplitude of each partial
+        sample_rate: Audio sample rate in Hz
+        duration: Duration in seconds
+        dtype: Sample dtype, np.float32 or np.float64
+        out: Optional C-contiguous buffer of n samples to render into, in
+            which case dtype is taken from it
+    """
+    num_samples = int(sample_rate * duration)
+    combined = np.empty(num_samples, dtype=dtype) if out is None else out
+    if num_samples:
+        # Same sample spacing as the linspace time axis
+        phase_step = 2 * np.pi * duration / num_samples
+        _sum_sines_nb(np.ascontiguousarray(frequencies, dtype=np.float64),
+                      np.ascontiguousarray(amplitudes, dtype=np.float64),
+                      phase_step, combined)
+    return combined
+
+
+@njit([types.void(types.float32[::1]), types.void(types.float64[::1])],
+      parallel=True, fastmath=True, cache=True)
+def _normalize_inplace(audio):
+    """Scale audio in place so its peak absolute amplitude is at most 1."""
+    peak = 0.0
+    for i in prange(audio.shape[0]):
+        peak = max(peak, abs(audio[i]))
+    if peak > 1.0:
+        for i in prange(audio.shape[0]):
+            audio[i] /= peak
+
+
+# Common ratios found in natural harmonic series, as exact num/den pairs
+_RATIO_NUMS = np.array([
+    1,  # Unison
+    2,  # Octave
+    3,  # Perfect fifth
+    4,  # Perfect fourth
+    5,  # Major third
+    6,  # Minor third
+], dtype=np.int64)
+_RATIO_DENS = np.array([1, 1, 2, 3, 4, 5], dtype=np.int64)
+_HARMONIC_RATIOS = _RATIO_NUMS / _RATIO_DENS
+
+
+# Default carriers for the core brainwave frequencies, keyed by target in centihertz
+_CORE_CARRIERS = {
+    1000: 200.0,  # Alpha, 10 Hz
+    600: 288.0,   # Theta, 6 Hz
+    200: 256.0,   # Delta, 2 Hz
+}
+
+
+@njit(types.UniTuple(types.float64, 2)(types.float64), cache=True)
+def _reduce_octaves_nb(ratio):
+    """
+    Divide powers of 2 out of a ratio above 2 until it lies in (1, 2].
+    
+    Reads the binary exponent with frexp instead of halving in a loop.
+    
+    Returns:
+        (reduced_ratio, power_of_2)
+    """
+    if ratio <= 2.0:
+        return ratio, 1.0
+    mantissa, exponent = math.frexp(ratio)  # ratio = mantissa * 2**exponent, mantissa in [0.5, 1)
+    if mantissa == 0.5:
+        # Exact powers of 2 reduce to 2.0, not 1.0
+        return 2.0, math.ldexp(1.0, exponent - 2)
+    return 2.0 * mantissa, math.ldexp(1.0, exponent - 1)
+
+
+@njit(types.int64(types.float64, types.int64[::1], types.int64[::1]), cache=True)
+def _match_ratio_nb(ratio, nums, dens):
+    """
+    Return the index of the harmonic ratio within 0.01 of ratio, or -1.
+    
+    Compares ratio * den against num, so no ratio table division is needed.
+    """
+    for k in range(nums.shape[0]):
+        if abs(ratio * dens[k] - nums[k]) < 0.01 * dens[k]:
+            return k
+    return -1
+
+
+@njit(types.Tuple((types.float64, types.float64, types.int64))(
+          types.float64, types.int64[::1], types.int64[::1]),
+      cache=True)
+def _decompose_ratio_nb(ratio, nums, dens):
+    """
+    Divide powers of 2 out of ratio and match the rest against the harmonic ratios.
+    
+    Returns:
+        (reduced_ratio, power_of_2, index of the matching harmonic or -1)
+    """
+    ratio, power_of_2 = _reduce_octaves_nb(ratio)
+    return ratio, power_of_2, _match_ratio_nb(ratio, nums, dens)
+
+
+@functools.lru_cache(maxsize=1024)
+def _decompose_ratio_cached(ratio: float) -> Tuple[float, float, int]:
+    """Memoized _decompose_ratio_nb over the module ratio table."""
+    return _decompose_ratio_nb(ratio, _RATIO_NUMS, _RATIO_DENS)
+
+
+@njit(types.float64(types.float64, types.float64, types.float64,
+                    types.int64[::1], types.int64[::1]),
+      cache=True)
+def _find_carrier_nb(target_freq, min_carrier, max_carrier, nums, dens):
+    """Return the lowest carrier in range forming a harmonic ratio with target_freq, else min_carrier."""
+    min_multiplier = int(math.ceil(min_carrier / target_freq))
+    max_multiplier = int(max_carrier / target_freq)
+    for multiplier in range(min_multiplier, max_multiplier + 1):
+        carrier = target_freq * multiplier
+        if carrier > max_carrier:
+            break
+        # carrier / target_freq is the multiplier itself, so reduce that directly
+        reduced_ratio = _reduce_octaves_nb(float(multiplier))[0]
+        if _match_ratio_nb(reduced_ratio, nums, dens) >= 0:
+            return carrier
+    return min_carrier
+
+
+@functools.lru_cache(maxsize=256)
+def _find_carrier_cached(target_freq: float, min_carrier: float, max_carrier: float) -> float:
+    """Memoized _find_carrier_nb over the module ratio table."""
+    return _find_carrier_nb(target_freq, min_carrier, max_carrier, _RATIO_NUMS, _RATIO_DENS)
+
+
 class HarmonicCalculator:
     """Calculate and validate harmonic relationships between frequencies."""
     
     def __init__(self):
         """Initialize the harmonic calculator."""
         # Common ratios found in natural harmonic series
-        self.harmonic_ratios = [
-            1.0,     # Unison
-            2.0,     # Octave
-            1.5,     # Perfect fifth
-            1.333,   # Perfect fourth
-            1.25,    # Major third
-            1.2,     # Minor third
-        ]
+        self.harmonic_ratios = _HARMONIC_RATIOS.tolist()
     
     def find_nearest_harmonic(self, base_freq: float,
                             target_freq: float) -> Tuple[float, float]:
@@ -35,12 +226,29 @@ class HarmonicCalculator:
         Returns:
             Tuple[float, float]: (harmonic_frequency, ratio)
         """
-        ratios = np.array(self.harmonic_ratios)
-        harmonics = base_freq * ratios
+        harmonics = base_freq * _HARMONIC_RATIOS
         
         # Find closest harmonic
         idx = np.abs(harmonics - target_freq).argmin()
-        return harmonics[idx], ratios[idx]
+        return harmonics[idx], _HARMONIC_RATIOS[idx]
+    
+    def find_nearest_harmonic_batch(self, base_freq: float,
+                                    target_freqs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the nearest harmonic frequency to each of several target frequencies.
+        
+        Args:
+            base_freq: Base frequency in Hz
+            target_freqs: Target frequencies to match harmonically
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (harmonic_frequencies, ratios), one per target
+        """
+        harmonics = base_freq * _HARMONIC_RATIOS
+        
+        # Distance from every target to every harmonic, closest per row
+        idx = np.abs(harmonics[None, :] - np.asarray(target_freqs)[:, None]).argmin(axis=1)
+        return harmonics[idx], _HARMONIC_RATIOS[idx]
     
     def calculate_harmonic_series(self, fundamental: float,
                                 num_harmonics: int = 5) -> List[float]:
@@ -54,7 +262,7 @@ class HarmonicCalculator:
         Returns:
             List[float]: List of harmonic frequencies
         """
-        return [fundamental * (n + 1) for n in range(num_harmonics)]
+        return (fundamental * np.arange(1, num_harmonics + 1)).tolist()
     
     def find_common_harmonics(self, freq1: float, freq2: float,
                             tolerance: float = 0.1) -> List[float]:
@@ -69,16 +277,15 @@ class HarmonicCalculator:
         Returns:
             List[float]: List of common harmonic frequencies
         """
-        harmonics1 = set(self.calculate_harmonic_series(freq1, 10))
-        harmonics2 = set(self.calculate_harmonic_series(freq2, 10))
+        n = np.arange(1, 11)
+        harmonics1 = freq1 * n
+        harmonics2 = freq2 * n
         
-        common = []
-        for h1 in harmonics1:
-            for h2 in harmonics2:
-                if abs(h1 - h2) <= tolerance:
-                    common.append((h1 + h2) / 2)  # Use average for slight mismatches
+        # Compare every pair of harmonics at once
+        i, j = np.nonzero(np.abs(harmonics1[:, None] - harmonics2[None, :]) <= tolerance)
+        common = (harmonics1[i] + harmonics2[j]) / 2  # Use average for slight mismatches
         
-        return sorted(common)
+        return np.sort(common).tolist()
     
     def _decompose_ratio(self, ratio: float, debug: bool = False) -> float:
         """
@@ -94,33 +301,27 @@ class HarmonicCalculator:
             float: 1.0 if harmonic match found, otherwise the unmatched ratio
         """
         original_ratio = ratio
-        power_of_2 = 1
-        
-        # First divide out powers of 2
-        while ratio > 2.0:
-            ratio /= 2.0
-            power_of_2 *= 2
+        ratio, power_of_2, match = _decompose_ratio_cached(float(ratio))
             
         if debug:
-            logger.debug(f"      Decomposing {original_ratio}:")
-            logger.debug(f"        After dividing by {power_of_2}: {ratio}")
+            logger.debug("      Decomposing %s:", original_ratio)
+            logger.debug("        After dividing by %d: %s", power_of_2, ratio)
             
-        # Now ratio is in range [1.0, 2.0]
-        # Check if it matches any of our basic harmonic ratios
-        for harmonic in self.harmonic_ratios:
-            if abs(ratio - harmonic) < 0.01:  # Allow small tolerance for floating point comparison
-                if debug:
-                    logger.debug(f"        Found match with harmonic ratio {harmonic}")
-                return 1.0  # Perfect match found
+        # Ratio is now in range [1.0, 2.0]; check if it matched a basic harmonic ratio
+        if match >= 0:
+            if debug:
+                logger.debug("        Found match with harmonic ratio %d/%d",
+                             _RATIO_NUMS[match], _RATIO_DENS[match])
+            return 1.0  # Perfect match found
         
         if debug:
-            logger.debug(f"        No harmonic match found, remainder: {ratio}")
+            logger.debug("        No harmonic match found, remainder: %s", ratio)
         return ratio  # Return the unmatched ratio
 
     def optimize_carrier_frequency(self, target_freq: float,
                                  min_carrier: float = 200.0,
                                  max_carrier: float = 1000.0,
-                                 debug: bool = True) -> float:
+                                 debug: bool = False) -> float:
         """
         Find optimal carrier frequency for target frequency. Handles special cases
         for key brainwave frequencies with scientifically validated carrier values:
@@ -143,42 +344,16 @@ class HarmonicCalculator:
         Returns:
             float: Optimal carrier frequency
         """
-        # Define core frequencies and their default carriers
-        core_carriers = {
-            10.0: 200.0,
-            6.0: 288.0,
-            2.0: 256.0
-        }
-        
-        # Check if this is a core frequency
-        if abs(target_freq - 10.0) < 0.01 or \
-        abs(target_freq - 6.0) < 0.01 or \
-        abs(target_freq - 2.0) < 0.01:
-            # Get the default carrier but ensure it's within min/max range
-            default_carrier = core_carriers[target_freq]
+        # Check if this is a core frequency, matched to the nearest 0.01 Hz
+        default_carrier = _CORE_CARRIERS.get(int(round(target_freq * 100)))
+        if default_carrier is not None:
+            # Use the default carrier only if it's within min/max range
             if default_carrier >= min_carrier and default_carrier <= max_carrier:
                 return default_carrier
         
         # For non-core frequencies or if default carrier is out of range,
         # find valid harmonic using standard algorithm
-        min_multiplier = int(np.ceil(min_carrier / target_freq))
-        max_multiplier = int(max_carrier / target_freq)
-        
-        for multiplier in range(min_multiplier, max_multiplier + 1):
-            carrier = target_freq * multiplier
-            if carrier > max_carrier:
-                break
-                
-            ratio = carrier / target_freq
-            reduced_ratio = ratio
-            while reduced_ratio > 2.0:
-                reduced_ratio /= 2.0
-                
-            for harmonic in self.harmonic_ratios:
-                if abs(reduced_ratio - harmonic) < 0.01:
-                    return carrier
-                    
-        return min_carrier
+        return _find_carrier_cached(float(target_freq), float(min_carrier), float(max_carrier))
 
     def validate_frequency_combination(self, freq1: float,
                                     freq2: float,
@@ -223,19 +398,35 @@ class HarmonicOvertoneGenerator:
             'min_amplitude': 0.1,     # Minimum amplitude for overtones
             'amplitude_decay': 0.7    # Decay factor for each successive harmonic
         }
+        # Per-thread scratch buffers; one generator is shared by request threads
+        self._scratch = threading.local()
+    
+    def _scratch_buffer(self, num_samples: int, dtype: np.dtype) -> np.ndarray:
+        """
+        Return a scratch buffer of num_samples, reallocated only when it grows.
         
-    def generate_overtones(self, fundamental: float, duration: float,
-                          base_amplitude: float = 0.5) -> np.ndarray:
+        The buffer is reused by the next call on the same thread, so it must
+        not escape the caller.
         """
-        Generate harmonic overtones for a fundamental frequency.
+        key = np.dtype(dtype).name
+        buffer = getattr(self._scratch, key, None)
+        if buffer is None or len(buffer) < num_samples:
+            buffer = np.empty(num_samples, dtype=dtype)
+            setattr(self._scratch, key, buffer)
+        return buffer[:num_samples]
+        
+    def overtone_table(self, fundamental: float,
+                       base_amplitude: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the frequencies and amplitudes of a fundamental's overtones.
         
         Args:
             fundamental: Fundamental frequency in Hz
-            duration: Duration in seconds
             base_amplitude: Base amplitude for fundamental (0-1)
             
         Returns:
-            numpy.ndarray: Combined audio with harmonics
+            Tuple[np.ndarray, np.ndarray]: (frequencies, amplitudes) of each partial,
+                starting with the fundamental
             
         Raises:
             ValueError: If frequency is invalid or exceeds safety limits
@@ -246,41 +437,87 @@ class HarmonicOvertoneGenerator:
         if fundamental > self.safety_limits['max_frequency']:
             raise ValueError(f"Frequency {fundamental} Hz exceeds safety limit of {self.safety_limits['max_frequency']} Hz")
             
-        # Calculate time array
-        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
+        # Fundamental plus overtones; both limits are monotonic in n, so the
+        # partials kept are a prefix of the series
+        n = np.arange(1, self.safety_limits['max_harmonics'] + 1, dtype=np.float64)
+        frequencies = fundamental * n
+        amplitudes = base_amplitude * self.safety_limits['amplitude_decay'] ** (n - 1)
+        keep = ((frequencies <= self.safety_limits['max_frequency'])
+                & (amplitudes >= self.safety_limits['min_amplitude']))
+        keep[0] = True  # The fundamental is always kept
+        count = keep.argmin() if not keep.all() else len(keep)
+        
+        return frequencies[:count], amplitudes[:count]
+        
+    def enhanced_table(self, target_freq: float,
+                       base_amplitude: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the partials of an enhanced frequency: carrier overtones
+        followed by target overtones, as mixed by generate_enhanced_frequency.
+        
+        Args:
+            target_freq: Target frequency for entrainment
+            base_amplitude: Base amplitude (0-1)
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (frequencies, amplitudes) of each partial
+        """
+        carrier = self.calculator.optimize_carrier_frequency(target_freq)
+        carrier_freqs, carrier_amps = self.overtone_table(carrier, base_amplitude * 0.6)
+        target_freqs, target_amps = self.overtone_table(target_freq, base_amplitude * 0.4)
+        return (np.concatenate((carrier_freqs, target_freqs)),
+                np.concatenate((carrier_amps, target_amps)))
         
-        # Start with fundamental frequency
-        combined = np.zeros_like(t)
-        amplitude = base_amplitude
+    def _render_partials(self, frequencies: np.ndarray, amplitudes: np.ndarray,
+                         duration: float, dtype: np.dtype = np.float32,
+                         out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Render a sum of sinusoids.
         
-        # Generate fundamental
-        combined += amplitude * np.sin(2 * np.pi * fundamental * t)
+        Args:
+            frequencies: Frequency of each partial in Hz
+            amplitudes: Amplitude of each partial
+            duration: Duration in seconds
+            dtype: Sample dtype, np.float32 or np.float64
+            out: Optional buffer to render into (see _sum_partials)
+            
+        Returns:
+            numpy.ndarray: Summed audio samples
+        """
+        return _sum_partials(frequencies, amplitudes, self.sample_rate, duration, dtype, out)
+        
+    def generate_overtones(self, fundamental: float, duration: float,
+                          base_amplitude: float = 0.5,
+                          dtype: np.dtype = np.float32,
+                          out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Generate harmonic overtones for a fundamental frequency.
         
-        # Generate overtones
-        for n in range(2, self.safety_limits['max_harmonics'] + 1):
-            harmonic_freq = fundamental * n
+        Args:
+            fundamental: Fundamental frequency in Hz
+            duration: Duration in seconds
+            base_amplitude: Base amplitude for fundamental (0-1)
+            dtype: Sample dtype; np.float32 halves memory traffic
+            out: Optional buffer to render into (see _sum_partials)
             
-            # Check if harmonic exceeds safety limit
-            if harmonic_freq > self.safety_limits['max_frequency']:
-                break
-                
-            # Calculate amplitude for this harmonic
-            amplitude *= self.safety_limits['amplitude_decay']
-            if amplitude < self.safety_limits['min_amplitude']:
-                break
-                
-            # Add harmonic to combined signal
-            combined += amplitude * np.sin(2 * np.pi * harmonic_freq * t)
+        Returns:
+            numpy.ndarray: Combined audio with harmonics
+            
+        Raises:
+            ValueError: If frequency is invalid or exceeds safety limits
+        """
+        frequencies, amplitudes = self.overtone_table(fundamental, base_amplitude)
+        combined = self._render_partials(frequencies, amplitudes, duration, dtype, out)
         
         # Normalize to prevent clipping
-        max_amplitude = np.max(np.abs(combined))
-        if max_amplitude > 1:
-            combined /= max_amplitude
+        _normalize_inplace(combined)
             
         return combined
         
     def generate_enhanced_frequency(self, target_freq: float, duration: float,
-                                  base_amplitude: float = 0.5) -> np.ndarray:
+                                  base_amplitude: float = 0.5,
+                                  dtype: np.dtype = np.float32,
+                                  out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Generate a frequency with harmonic enhancement for better entrainment.
         
@@ -288,6 +525,8 @@ class HarmonicOvertoneGenerator:
             target_freq: Target frequency for entrainment
             duration: Duration in seconds
             base_amplitude: Base amplitude (0-1)
+            dtype: Sample dtype; np.float32 halves memory traffic
+            out: Optional buffer to render into (see _sum_partials)
             
         Returns:
             numpy.ndarray: Enhanced audio signal with harmonics
@@ -295,18 +534,26 @@ class HarmonicOvertoneGenerator:
         # Get optimal carrier frequency
         carrier = self.calculator.optimize_carrier_frequency(target_freq)
         
-        # Generate carrier with overtones
-        carrier_signal = self.generate_overtones(carrier, duration, base_amplitude * 0.6)
-        
-        # Generate target frequency with subtle overtones
-        target_signal = self.generate_overtones(target_freq, duration, base_amplitude * 0.4)
+        # Carrier with overtones and target frequency with subtle overtones
+        carrier_freqs, carrier_amps = self.overtone_table(carrier, base_amplitude * 0.6)
+        target_freqs, target_amps = self.overtone_table(target_freq, base_amplitude * 0.4)
         
-        # Combine signals
-        combined = carrier_signal + target_signal
+        if carrier_amps.sum() > 1 or target_amps.sum() > 1:
+            # A component may clip on its own, so normalize each one separately
+            combined = self.generate_overtones(carrier, duration, base_amplitude * 0.6, dtype, out)
+            combined += self.generate_overtones(
+                target_freq, duration, base_amplitude * 0.4, combined.dtype,
+                self._scratch_buffer(len(combined), combined.dtype)
+            )
+        else:
+            # Neither component can clip, so render all partials in one pass
+            combined = self._render_partials(
+                np.concatenate((carrier_freqs, target_freqs)),
+                np.concatenate((carrier_amps, target_amps)),
+                duration, dtype, out
+            )
         
         # Normalize to prevent clipping
-        max_amplitude = np.max(np.abs(combined))
-        if max_amplitude > 1:
-            combined /= max_amplitude
+        _normalize_inplace(combined)
             
         return combined
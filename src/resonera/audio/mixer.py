@@ -1,13 +1,91 @@
 """
 Background sound mixing and equalization for neural entrainment audio.
 """
+import functools
 import numpy as np
+from numba import njit, prange, types
+from scipy.fft import rfft, irfft, rfftfreq
 from typing import Literal, Union, Optional
 import logging
+from .harmonics import (_TIME_AXIS_CACHE_MAX_SAMPLES, _normalize_inplace,
+                        _sum_partials, _two_pi_t)
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=32)
+def _band_bins(num_samples: int, sample_rate: int,
+               low_freq: float, high_freq: float) -> slice:
+    """
+    Return the slice of rfft bins whose frequencies lie in [low_freq, high_freq].
+    
+    rfft bin frequencies increase monotonically, so a band is one contiguous run.
+    """
+    freqs = rfftfreq(num_samples, 1/sample_rate)
+    start = np.searchsorted(freqs, low_freq, side='left')
+    stop = np.searchsorted(freqs, high_freq, side='right')
+    return slice(int(start), int(stop))
+
+
+@functools.lru_cache(maxsize=8)
+def _pink_filter(num_samples: int) -> np.ndarray:
+    """Return a cached, read-only float32 1/sqrt(f) filter for rfft bins 1 and up."""
+    pink_filter = (1 / np.sqrt(rfftfreq(num_samples)[1:])).astype(np.float32)
+    pink_filter.setflags(write=False)
+    return pink_filter
+
+
+# Drone partials relative to the base frequency, with decreasing amplitudes
+_DRONE_HARMONICS = np.array([1.0, 1.5, 2.0, 2.5, 3.0])
+_DRONE_AMPLITUDES = np.array([1.0, 0.5, 0.3, 0.2, 0.1])
+
+
+def _build_drone_modulation(sample_rate: int, duration: float) -> np.ndarray:
+    """Build the subtle 0.1 Hz amplitude modulation applied to the drone."""
+    mod_freq = 0.1  # 0.1 Hz modulation
+    modulation = np.sin(mod_freq * _two_pi_t(sample_rate, duration))
+    modulation *= 0.1
+    modulation += 1
+    return modulation
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_drone_modulation(sample_rate: int, duration: float) -> np.ndarray:
+    """Return a cached, read-only drone modulation envelope."""
+    modulation = _build_drone_modulation(sample_rate, duration)
+    modulation.setflags(write=False)
+    return modulation
+
+
+def _drone_modulation(sample_rate: int, duration: float) -> np.ndarray:
+    """
+    Return the drone modulation envelope, cached for the same lengths as
+    the time axis. Cached envelopes must not be modified.
+    """
+    if int(sample_rate * duration) <= _TIME_AXIS_CACHE_MAX_SAMPLES:
+        return _cached_drone_modulation(sample_rate, duration)
+    return _build_drone_modulation(sample_rate, duration)
+
+
+@njit(types.void(types.float64[:, ::1], types.float64[::1]),
+      parallel=True, fastmath=True, cache=True)
+def _mix_normalize_nb(mixed, background):
+    """
+    Add background to every row of mixed in place, then scale down any row
+    whose peak exceeds 1. The add and the peak scan share a single pass.
+    """
+    num_samples = mixed.shape[1]
+    for c in range(mixed.shape[0]):
+        row = mixed[c]
+        peak = 0.0
+        for i in prange(num_samples):
+            row[i] += background[i]
+            peak = max(peak, abs(row[i]))
+        if peak > 1.0:
+            for i in prange(num_samples):
+                row[i] /= peak
+
+
 class Equalizer:
     """Simple parametric equalizer for audio processing."""
     
@@ -25,40 +103,46 @@ class Equalizer:
             'high': (4000, 20000) # High frequencies
         }
         
-    def apply_band_filter(self, audio: np.ndarray, band: str,
-                         gain_db: float) -> np.ndarray:
+    def _apply_gains(self, audio: np.ndarray, gains: dict) -> np.ndarray:
         """
-        Apply gain to a specific frequency band.
+        Apply gains to several frequency bands with a single FFT round trip.
         
         Args:
             audio: Input audio array
-            band: Frequency band ('low', 'mid', 'high')
-            gain_db: Gain in decibels (-12 to +12 dB)
+            gains: Dictionary of band gains in dB
             
         Returns:
             numpy.ndarray: Filtered audio
         """
-        if band not in self.bands:
-            raise ValueError(f"Invalid band: {band}")
-            
-        # Convert gain from dB to linear scale
-        gain = 10 ** (gain_db / 20)
+        for band in gains:
+            if band not in self.bands:
+                raise ValueError(f"Invalid band: {band}")
         
-        # Get frequency range for band
-        low_freq, high_freq = self.bands[band]
+        # Perform FFT across all cores
+        fft = rfft(audio, workers=-1)
         
-        # Perform FFT
-        fft = np.fft.rfft(audio)
-        freqs = np.fft.rfftfreq(len(audio), 1/self.sample_rate)
+        # Apply each band's linear gain to its contiguous run of bins in place
+        for band, gain_db in gains.items():
+            low_freq, high_freq = self.bands[band]
+            fft[_band_bins(len(audio), self.sample_rate, low_freq, high_freq)] *= 10 ** (gain_db / 20)
         
-        # Create band mask
-        mask = (freqs >= low_freq) & (freqs <= high_freq)
+        # Inverse FFT
+        return irfft(fft, len(audio), overwrite_x=True, workers=-1)
         
-        # Apply gain to band
-        fft[mask] *= gain
+    def apply_band_filter(self, audio: np.ndarray, band: str,
+                         gain_db: float) -> np.ndarray:
+        """
+        Apply gain to a specific frequency band.
         
-        # Inverse FFT
-        return np.fft.irfft(fft, len(audio))
+        Args:
+            audio: Input audio array
+            band: Frequency band ('low', 'mid', 'high')
+            gain_db: Gain in decibels (-12 to +12 dB)
+            
+        Returns:
+            numpy.ndarray: Filtered audio
+        """
+        return self._apply_gains(audio, {band: gain_db})
         
     def process(self, audio: np.ndarray, gains: dict) -> np.ndarray:
         """
@@ -71,14 +155,11 @@ class Equalizer:
         Returns:
             numpy.ndarray: Equalized audio
         """
-        result = np.copy(audio)
-        for band, gain in gains.items():
-            result = self.apply_band_filter(result, band, gain)
+        # Band gains multiply per bin, so all bands share one transform
+        result = self._apply_gains(audio, gains)
             
         # Normalize after applying all filters
-        max_amplitude = np.max(np.abs(result))
-        if max_amplitude > 1:
-            result /= max_amplitude
+        _normalize_inplace(result)
             
         return result
 
@@ -95,35 +176,40 @@ class BackgroundSoundMixer:
         """
         self.sample_rate = sample_rate
         self.equalizer = Equalizer(sample_rate=sample_rate)
+        self.rng = np.random.default_rng()
         
     def generate_white_noise(self, duration: float,
-                           volume: float = 0.1) -> np.ndarray:
+                           volume: float = 0.1,
+                           dtype: np.dtype = np.float64) -> np.ndarray:
         """
         Generate white noise background.
         
         Args:
             duration: Duration in seconds
             volume: Volume level (0-1)
+            dtype: Sample dtype of the result; shaping is always done in float32
             
         Returns:
             numpy.ndarray: White noise audio
         """
         samples = int(self.sample_rate * duration)
-        noise = np.random.normal(0, 1, samples)
+        noise = np.empty(samples, dtype=np.float32)
+        self.rng.standard_normal(dtype=np.float32, out=noise)
         
-        # Shape noise with pink filter (more natural sounding)
-        fft = np.fft.rfft(noise)
-        freqs = np.fft.rfftfreq(len(noise))
-        pink_filter = 1 / np.sqrt(freqs[1:])  # 1/f filter
-        fft[1:] *= pink_filter
-        noise = np.fft.irfft(fft)
+        # Shape noise with pink filter (more natural sounding); float32 input
+        # keeps the spectrum in complex64
+        fft = rfft(noise, workers=-1)
+        fft[1:] *= _pink_filter(samples)  # 1/f filter
+        noise = irfft(fft, samples, overwrite_x=True, workers=-1)
         
         # Normalize and apply volume
-        noise = noise / np.max(np.abs(noise)) * volume
+        noise = np.divide(noise, max(noise.max(), -noise.min()), dtype=dtype)
+        noise *= volume
         return noise
         
     def generate_ambient_drone(self, duration: float, base_freq: float = 100.0,
-                             volume: float = 0.1) -> np.ndarray:
+                             volume: float = 0.1,
+                             dtype: np.dtype = np.float64) -> np.ndarray:
         """
         Generate ambient drone background.
         
@@ -131,28 +217,21 @@ class BackgroundSoundMixer:
             duration: Duration in seconds
             base_freq: Base frequency for drone
             volume: Volume level (0-1)
+            dtype: Sample dtype; np.float32 halves memory traffic
             
         Returns:
             numpy.ndarray: Ambient drone audio
         """
-        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
-        
         # Generate multiple harmonics for rich drone sound
-        harmonics = [1.0, 1.5, 2.0, 2.5, 3.0]  # Harmonic series
-        amplitudes = [1.0, 0.5, 0.3, 0.2, 0.1]  # Decreasing amplitudes
-        
-        drone = np.zeros_like(t)
-        for harmonic, amplitude in zip(harmonics, amplitudes):
-            freq = base_freq * harmonic
-            drone += amplitude * np.sin(2 * np.pi * freq * t)
+        drone = _sum_partials(base_freq * _DRONE_HARMONICS, _DRONE_AMPLITUDES,
+                              self.sample_rate, duration, dtype)
         
         # Add subtle modulation
-        mod_freq = 0.1  # 0.1 Hz modulation
-        modulation = 1 + 0.1 * np.sin(2 * np.pi * mod_freq * t)
-        drone *= modulation
+        drone *= _drone_modulation(self.sample_rate, duration)
         
         # Normalize and apply volume
-        drone = drone / np.max(np.abs(drone)) * volume
+        drone /= max(drone.max(), -drone.min())
+        drone *= volume
         return drone
         
     def mix_background(self, main_audio: Union[np.ndarray, tuple[np.ndarray, np.ndarray]],
@@ -171,14 +250,13 @@ class BackgroundSoundMixer:
         Returns:
             Mixed audio (same format as input)
         """
-        # Handle stereo input
+        # Mix into a fresh (channels, samples) array, one row per channel
         is_stereo = isinstance(main_audio, tuple)
         if is_stereo:
-            duration = len(main_audio[0]) / self.sample_rate
-            channels = [np.array(ch) for ch in main_audio]
+            mixed = np.stack(main_audio).astype(np.float64, copy=False)
         else:
-            duration = len(main_audio) / self.sample_rate
-            channels = [np.array(main_audio)]
+            mixed = np.array(main_audio, dtype=np.float64)[None, :]
+        duration = mixed.shape[1] / self.sample_rate
             
         # Generate background
         if background_type == 'white_noise':
@@ -190,13 +268,7 @@ class BackgroundSoundMixer:
         if eq_gains:
             background = self.equalizer.process(background, eq_gains)
             
-        # Mix with each channel
-        mixed_channels = [ch + background for ch in channels]
-        
-        # Normalize to prevent clipping
-        for i, channel in enumerate(mixed_channels):
-            max_amplitude = np.max(np.abs(channel))
-            if max_amplitude > 1:
-                mixed_channels[i] = channel / max_amplitude
+        # Mix with every channel and normalize each channel that would clip
+        _mix_normalize_nb(mixed, np.ascontiguousarray(background, dtype=np.float64))
                 
-        return tuple(mixed_channels) if is_stereo else mixed_channels[0]
+        return tuple(mixed) if is_stereo else mixed[0]
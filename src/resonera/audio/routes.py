@@ -1,50 +1,179 @@
 """
 Routes for audio generation and session management.
 """
-from flask import Blueprint, request, jsonify, send_file
-from flask_jwt_extended import jwt_required, get_jwt_identity
+import atexit
+import multiprocessing
+import os
+import threading
+from typing import BinaryIO
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, stream_with_context
+from flask_jwt_extended import jwt_required
+from ..core.auth import current_user_id
 from ..database import db, Session, SafetyLog
 from .generator import AudioGenerator
 from ..safety.validator import SafetyValidator
 
 bp = Blueprint('audio', __name__)
+# Shared by all requests; per-session state is passed to generate()
 audio_generator = AudioGenerator()
 safety_validator = SafetyValidator()
 
+# File renders run in a pool of worker processes, keeping Numba kernels and
+# WAV writing off the server process and capping concurrent renders at the
+# pool size; the request thread still waits for its render. The pool is
+# created on first use in each process, so a forked server worker never
+# shares another process's pool pipes. Workers are spawned rather than forked
+# because forking after Numba's threading layer has started is unsafe.
+_render_pool = None
+_render_pool_pid = None
+_render_pool_lock = threading.Lock()
+
+
+def _init_render_worker(num_threads: int) -> None:
+    """Limit the Numba threads each render worker runs its kernels on."""
+    import numba
+    numba.set_num_threads(min(num_threads, numba.config.NUMBA_NUM_THREADS))
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    """Return this process's render pool, creating it on first use."""
+    global _render_pool, _render_pool_pid
+    with _render_pool_lock:
+        if _render_pool is None or _render_pool_pid != os.getpid():
+            # A pool inherited through fork belongs to the parent; leave it be
+            _render_pool = ProcessPoolExecutor(
+                max_workers=current_app.config['RENDER_WORKERS'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_render_worker,
+                initargs=(current_app.config['RENDER_THREADS'],)
+            )
+            _render_pool_pid = os.getpid()
+            atexit.register(_render_pool.shutdown, cancel_futures=True)
+        return _render_pool
+
+
+def _discard_render_pool(pool: ProcessPoolExecutor) -> None:
+    """Shut down a broken render pool so the next render gets a fresh one."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_to_tempfile(output_dir: str, frequency: float, duration: float,
+                        volume: float, previous_frequency: float | None) -> str:
+    """Render a session to a (possibly cached) WAV file in a pool worker and return its path."""
+    return audio_generator.generate(
+        frequency=frequency,
+        duration=duration,
+        volume=volume,
+        previous_frequency=previous_frequency,
+        output_dir=output_dir,
+        cache=True
+    )
+
+
+def _submit_render(*args) -> str:
+    """
+    Render a session in the pool and return the WAV file's path.
+    
+    A worker that dies (killed for memory, or crashed in a kernel) breaks
+    the whole pool, so the render is retried once on a fresh one.
+    """
+    pool = _get_render_pool()
+    try:
+        return pool.submit(_render_to_tempfile, *args).result()
+    except BrokenProcessPool:
+        _discard_render_pool(pool)
+        return _get_render_pool().submit(_render_to_tempfile, *args).result()
+
+
+def _open_render(*args) -> BinaryIO:
+    """
+    Render a session in the pool and open the resulting WAV file.
+    
+    Other renders can evict a cached file before it is opened, in which case
+    it is rendered again; once open, the handle stays readable while it is
+    sent even if the file is evicted.
+    """
+    path = _submit_render(*args)
+    try:
+        return open(path, 'rb')
+    except FileNotFoundError:
+        return open(_submit_render(*args), 'rb')
+
+
+def _is_number(value) -> bool:
+    """Return whether a JSON value is a number (JSON booleans are not)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
 @bp.route('/generate', methods=['POST'])
 @jwt_required()
 def generate_audio():
     """Generate neural entrainment audio."""
-    user_id = get_jwt_identity()
-    data = request.get_json()
+    user_id = current_user_id()
+    data = request.get_json(silent=True)
     
     # Validate required parameters
-    required_params = ['target_frequency', 'duration']
-    if not all(param in data for param in required_params):
+    if not data or 'target_frequency' not in data or 'duration' not in data:
         return jsonify({'error': 'Missing required parameters'}), 400
     
-    # Validate frequency range
-    if not safety_validator.validate_frequency(data['target_frequency']):
+    # Validate frequency range; the validator reads the limits once per app
+    frequency = data['target_frequency']
+    if not _is_number(frequency) or not safety_validator.validate_frequency(frequency):
         return jsonify({'error': 'Frequency out of safe range'}), 400
     
+    # Bound the duration before it reaches a render worker's memory
+    if not _is_number(data['duration']) or not safety_validator.validate_duration(data['duration']):
+        return jsonify({'error': 'Duration out of safe range'}), 400
+    
+    session = None
+    audio = None
     try:
-        # Create new session
+        # Transition from the frequency of the user's most recent session
+        # that rendered; start_time has one-second resolution, so the id
+        # breaks ties between back-to-back sessions
+        render_failed = db.session.query(SafetyLog.id).filter(
+            SafetyLog.session_id == Session.id,
+            SafetyLog.event_type == 'GENERATION_ERROR'
+        ).exists()
+        previous_frequency = db.session.query(Session.target_frequency).filter(
+            Session.user_id == user_id, ~render_failed
+        ).order_by(Session.start_time.desc(), Session.id.desc()).limit(1).scalar()
+        
+        # Create new session; it is saved together with its log entry once
+        # rendering finishes, so no transaction is held open during the render
         session = Session(
             user_id=user_id,
             target_frequency=data['target_frequency'],
             volume_level=data.get('volume', 0.7)
         )
-        db.session.add(session)
-        db.session.commit()
         
-        # Generate audio
-        audio_file = audio_generator.generate(
-            frequency=data['target_frequency'],
-            duration=data['duration'],
-            volume=data.get('volume', 0.7)
-        )
+        # Generate audio, streamed straight to the client if requested. Streams
+        # are synthesized chunk by chunk in this thread as the client reads
+        # them, so they start at once but bypass the render pool
+        if data.get('stream'):
+            audio = audio_generator.generate_iter(
+                frequency=data['target_frequency'],
+                duration=data['duration'],
+                volume=data.get('volume', 0.7),
+                previous_frequency=previous_frequency
+            )
+        else:
+            audio = _open_render(
+                current_app.config['AUDIO_UPLOAD_FOLDER'],
+                data['target_frequency'],
+                data['duration'],
+                data.get('volume', 0.7),
+                previous_frequency
+            )
         
         # Log successful generation
+        db.session.add(session)
+        db.session.flush()  # Assigns session.id
         safety_log = SafetyLog(
             session_id=session.id,
             event_type='AUDIO_GENERATED',
@@ -54,16 +183,31 @@ def generate_audio():
         db.session.add(safety_log)
         db.session.commit()
         
+        download_name = f'entrainment_{session.id}.wav'
+        if data.get('stream'):
+            return Response(
+                stream_with_context(audio),
+                mimetype='audio/wav',
+                headers={'Content-Disposition': f'attachment; filename={download_name}'}
+            )
+        
         return send_file(
-            audio_file,
+            audio,
             mimetype='audio/wav',
             as_attachment=True,
-            download_name=f'entrainment_{session.id}.wav'
+            download_name=download_name
         )
         
     except Exception as e:
+        # The response never took ownership of the open file or stream
+        if audio is not None:
+            audio.close()
+        
         # Log error
         if session:
+            db.session.rollback()
+            db.session.add(session)
+            db.session.flush()
             safety_log = SafetyLog(
                 session_id=session.id,
                 event_type='GENERATION_ERROR',
@@ -79,26 +223,32 @@ def generate_audio():
 @jwt_required()
 def get_sessions():
     """Get user's entrainment sessions."""
-    user_id = get_jwt_identity()
+    user_id = current_user_id()
     
-    sessions = Session.query.filter_by(user_id=user_id).order_by(Session.start_time.desc()).all()
+    # Fetch plain column tuples rather than full ORM objects
+    rows = Session.query.with_entities(
+        Session.id, Session.start_time, Session.end_time,
+        Session.target_frequency, Session.actual_frequency,
+        Session.volume_level, Session.effectiveness_rating, Session.notes
+    ).filter_by(user_id=user_id).order_by(Session.start_time.desc()).all()
     
     return jsonify([{
-        'id': session.id,
-        'start_time': session.start_time.isoformat(),
-        'end_time': session.end_time.isoformat() if session.end_time else None,
-        'target_frequency': session.target_frequency,
-        'actual_frequency': session.actual_frequency,
-        'volume_level': session.volume_level,
-        'effectiveness_rating': session.effectiveness_rating,
-        'notes': session.notes
-    } for session in sessions]), 200
+        'id': id_,
+        'start_time': start_time.isoformat(),
+        'end_time': end_time.isoformat() if end_time else None,
+        'target_frequency': target_frequency,
+        'actual_frequency': actual_frequency,
+        'volume_level': volume_level,
+        'effectiveness_rating': effectiveness_rating,
+        'notes': notes
+    } for (id_, start_time, end_time, target_frequency, actual_frequency,
+           volume_level, effectiveness_rating, notes) in rows]), 200
 
 @bp.route('/sessions/<int:session_id>/rate', methods=['POST'])
 @jwt_required()
 def rate_session(session_id):
     """Rate the effectiveness of a session."""
-    user_id = get_jwt_identity()
+    user_id = current_user_id()
     data = request.get_json()
     
     if 'rating' not in data:
@@ -119,7 +269,7 @@ def rate_session(session_id):
 @jwt_required()
 def stop_session(session_id):
     """Stop an active entrainment session."""
-    user_id = get_jwt_identity()
+    user_id = current_user_id()
     
     session = Session.query.filter_by(id=session_id, user_id=user_id).first()
     if not session:
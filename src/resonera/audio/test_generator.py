@@ -8,6 +8,24 @@ from flask import Flask
 from .generator import AudioGenerator
 
 class TestAudioGenerator(unittest.TestCase):
+    test_frequency = 10.0  # 10 Hz alpha wave
+    test_duration = 1.0    # 1 second
+    test_volume = 0.7      # 70% volume
+    
+    @classmethod
+    def setUpClass(cls):
+        # Render the shared test clips once; tests must not modify them
+        cls.generator = AudioGenerator()
+        cls.wave = cls.generator.generate_sine_wave(
+            cls.test_frequency, cls.test_duration, cls.test_volume
+        )
+        cls.binaural = cls.generator.generate_binaural_beat(
+            cls.test_frequency, cls.test_duration, cls.test_volume
+        )
+        cls.tone = cls.generator.generate_isochronic_tone(
+            cls.test_frequency, cls.test_duration, cls.test_volume
+        )
+    
     def setUp(self):
         # Create test Flask app
         self.app = Flask(__name__)
@@ -16,35 +34,50 @@ class TestAudioGenerator(unittest.TestCase):
         })
         self.ctx = self.app.app_context()
         self.ctx.push()
-        
-        self.generator = AudioGenerator()
-        self.test_frequency = 10.0  # 10 Hz alpha wave
-        self.test_duration = 1.0    # 1 second
-        self.test_volume = 0.7      # 70% volume
     
     def tearDown(self):
         self.ctx.pop()
     
     def test_sine_wave_generation(self):
         """Test basic sine wave generation."""
-        wave = self.generator.generate_sine_wave(
-            self.test_frequency,
-            self.test_duration,
-            self.test_volume
-        )
+        wave = self.wave
         
         # Check wave properties
         self.assertEqual(len(wave), int(self.generator.sample_rate * self.test_duration))
+        self.assertEqual(wave.dtype, np.float32)
         self.assertLessEqual(np.max(wave), self.test_volume)
         self.assertGreaterEqual(np.min(wave), -self.test_volume)
     
+    def test_audio_layout(self):
+        """Test public audio arrays are C-contiguous float32."""
+        for audio in (*self.binaural, self.tone, self.wave):
+            self.assertEqual(audio.dtype, np.float32)
+            self.assertTrue(audio.flags['C_CONTIGUOUS'])
+    
+    def test_sine_wave_accuracy(self):
+        """Test recurrence-based sine wave matches exact sine over long clips."""
+        duration = 3.0  # Spans several re-seed blocks
+        for frequency in (0.5, 10.0, 440.0, 1000.0):
+            wave = self.generator.generate_sine_wave(frequency, duration, 1.0)
+            n = np.arange(len(wave))
+            expected = np.sin(2 * np.pi * frequency * n / self.generator.sample_rate)
+            np.testing.assert_allclose(wave, expected, atol=1e-6)
+    
+    def test_sine_wave_cache(self):
+        """Test cached sine waves are scaled per call and not shared."""
+        quiet = self.generator.generate_sine_wave(self.test_frequency, self.test_duration, 0.2)
+        loud = self.generator.generate_sine_wave(self.test_frequency, self.test_duration, 0.6)
+        
+        np.testing.assert_allclose(loud, quiet * 3, rtol=1e-5, atol=1e-7)
+        
+        # Callers may modify returned audio without corrupting the cache
+        quiet *= 0
+        again = self.generator.generate_sine_wave(self.test_frequency, self.test_duration, 0.2)
+        self.assertGreater(np.max(again), 0.19)
+    
     def test_binaural_beat_generation(self):
         """Test binaural beat generation."""
-        left, right = self.generator.generate_binaural_beat(
-            self.test_frequency,
-            self.test_duration,
-            self.test_volume
-        )
+        left, right = self.binaural
         
         # Check both channels are generated
         self.assertEqual(len(left), len(right))
@@ -54,13 +87,23 @@ class TestAudioGenerator(unittest.TestCase):
         self.assertLessEqual(np.max(left), self.test_volume)
         self.assertLessEqual(np.max(right), self.test_volume)
     
+    def test_binaural_output_buffer(self):
+        """Test binaural beats render into caller-supplied buffers."""
+        out = np.empty((2, len(self.binaural[0])), dtype=np.float32)
+        left, right = self.generator.generate_binaural_beat(
+            self.test_frequency, self.test_duration, self.test_volume, out=out
+        )
+        self.assertTrue(np.shares_memory(left, out) and np.shares_memory(right, out))
+        np.testing.assert_array_equal(out, self.binaural)
+        
+        with self.assertRaises(ValueError):
+            self.generator.generate_binaural_beat(
+                self.test_frequency, self.test_duration, self.test_volume, out=out[:, 1:]
+            )
+    
     def test_isochronic_tone_generation(self):
         """Test isochronic tone generation."""
-        tone = self.generator.generate_isochronic_tone(
-            self.test_frequency,
-            self.test_duration,
-            self.test_volume
-        )
+        tone = self.tone
         
         # Check tone properties
         self.assertEqual(len(tone), int(self.generator.sample_rate * self.test_duration))
@@ -68,17 +111,220 @@ class TestAudioGenerator(unittest.TestCase):
     
     def test_frequency_transition(self):
         """Test frequency transition between states."""
-        # Generate first audio
-        with patch('tempfile.NamedTemporaryFile') as mock_temp:
-            mock_temp.return_value.name = '/tmp/test1.wav'
+        with patch.object(self.generator, '_generate_transition',
+                          wraps=self.generator._generate_transition) as transition:
+            # First session has nothing to transition from
             self.generator.generate(10.0, 1.0)  # Alpha
+            transition.assert_not_called()
+            
+            # Second session transitions from the previous frequency
+            self.generator.generate(4.0, 2.0, previous_frequency=10.0)  # Theta
+            transition.assert_called_once()
+    
+    def test_synthesize_all(self):
+        """Test fused synthesis matches the separate binaural and isochronic paths."""
+        n = int(self.generator.sample_rate * self.test_duration)
+        # 0.35 renders through the fused kernel, 2.0 falls back to normalized rendering
+        for volume in (0.35, 2.0):
+            left, right, iso = (np.empty(n, dtype=np.float32) for _ in range(3))
+            peak_bound = self.generator._synthesize_all(
+                self.test_frequency, self.test_duration, volume, left, right, iso
+            )
+            
+            # The analytic bound must cover the mixed peak
+            mixed_peak = max(np.max(np.abs(left + iso)), np.max(np.abs(right + iso)))
+            self.assertLessEqual(mixed_peak, peak_bound + 1e-5)
+            
+            expected_left, expected_right = self.generator.generate_binaural_beat(
+                self.test_frequency, self.test_duration, volume
+            )
+            expected_iso = self.generator.generate_isochronic_tone(
+                self.test_frequency, self.test_duration, volume
+            )
+            np.testing.assert_allclose(left, expected_left, atol=1e-5)
+            np.testing.assert_allclose(right, expected_right, atol=1e-5)
+            np.testing.assert_allclose(iso, expected_iso, atol=1e-5)
+    
+    def test_buffer_layout_checked(self):
+        """Test synthesis rejects output buffers the kernels cannot write."""
+        n = int(self.generator.sample_rate * self.test_duration)
+        good = np.empty(n, dtype=np.float32)
+        for bad in (np.empty(n, dtype=np.float64), np.empty(2 * n, dtype=np.float32)[::2]):
+            with self.assertRaises(ValueError):
+                self.generator._synthesize_all(
+                    self.test_frequency, self.test_duration, 0.35, bad, good, good
+                )
+    
+    def test_cuda_backend(self):
+        """Test the CUDA backend falls back to the CPU or matches its output."""
+        with self.assertRaises(ValueError):
+            AudioGenerator(backend='opencl')
+        
+        generator = AudioGenerator(backend='cuda')
+        if generator.backend == 'cpu':
+            return
+        
+        n = int(generator.sample_rate * 0.1)
+        expected = [np.empty(n, dtype=np.float32) for _ in range(3)]
+        actual = [np.empty(n, dtype=np.float32) for _ in range(3)]
+        self.generator._synthesize_all(self.test_frequency, 0.1, 0.35, *expected)
+        generator._synthesize_all(self.test_frequency, 0.1, 0.35, *actual)
+        for a, e in zip(actual, expected):
+            np.testing.assert_allclose(a, e, atol=1e-4)
+    
+    def test_transition_audio(self):
+        """Test transition audio follows the frequency curve without gaps."""
+        freq_curve = self.generator.transition.linear_transition(10.0, 4.0, 0.5)
+        left = np.empty(len(freq_curve), dtype=np.float32)
+        right = np.empty(len(freq_curve), dtype=np.float32)
+        iso = np.empty(len(freq_curve), dtype=np.float32)
+        self.generator._generate_transition(freq_curve, 0.35, left, right, iso)
+        
+        # Transition must be audible and within volume
+        self.assertGreater(np.max(np.abs(left)), 0.3)
+        self.assertGreater(np.max(np.abs(right)), 0.3)
+        self.assertLessEqual(np.max(np.abs(left)), 0.35)
+        self.assertLessEqual(np.max(np.abs(iso)), 0.35)
+    
+    def test_generate_output(self):
+        """Test generated WAV is faded, normalized 16-bit stereo."""
+        from scipy.io import wavfile
+        
+        audio_file = self.generator.generate(self.test_frequency, self.test_duration)
+        sample_rate, audio = wavfile.read(audio_file)
+        
+        self.assertEqual(sample_rate, self.generator.sample_rate)
+        self.assertEqual(audio.dtype, np.int16)
+        self.assertEqual(audio.shape, (int(sample_rate * self.test_duration), 2))
+        
+        # Fades start and end in silence
+        np.testing.assert_array_equal(audio[0], [0, 0])
+        np.testing.assert_array_equal(audio[-1], [0, 0])
+        self.assertGreater(np.max(np.abs(audio)), 0)
+    
+    def test_generate_cache(self):
+        """Test cached renders are reused only for identical parameters."""
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as audio_dir, \
+                patch.object(self.generator, '_render', wraps=self.generator._render) as render:
+            first = self.generator.generate(10.0, 0.5, output_dir=audio_dir, cache=True)
+            again = self.generator.generate(10.0, 0.5, output_dir=audio_dir, cache=True)
+            self.assertEqual(first, again)
+            render.assert_called_once()
+            
+            other = self.generator.generate(10.0, 0.5, previous_frequency=6.0,
+                                            output_dir=audio_dir, cache=True)
+            self.assertNotEqual(other, first)
+            self.assertEqual(render.call_count, 2)
+            
+            # Uncached renders always get a fresh file
+            uncached = self.generator.generate(10.0, 0.5, output_dir=audio_dir)
+            self.assertNotIn(uncached, (first, other))
+    
+    def test_generate_cache_eviction(self):
+        """Test the least recently used renders are evicted over the size limit."""
+        import os
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as audio_dir, \
+                patch.object(self.generator, 'RENDER_CACHE_MAX_BYTES', 0):
+            old = self.generator.generate(10.0, 0.5, output_dir=audio_dir, cache=True)
+            os.utime(old, (0, 0))
+            new = self.generator.generate(6.0, 0.5, output_dir=audio_dir, cache=True)
+            
+            # The newest render is kept even when it alone exceeds the limit
+            self.assertTrue(os.path.exists(new))
+            self.assertFalse(os.path.exists(old))
+    
+    def test_transition_junction(self):
+        """Test the transition joins the fixed-frequency audio without a click."""
+        curve, _ = self.generator._transition_curve(20.0, 77.1, 'linear', 4.0)
+        n_transition = len(curve)
+        left, right, _ = self.generator._render(20.0, 77.1, 0.7, 'linear', 4.0)
+        
+        for channel in (left, right):
+            steps = np.abs(np.diff(channel))
+            junction = steps[n_transition - 50:n_transition + self.generator._junction_length]
+            self.assertLessEqual(junction.max(), np.percentile(steps, 99.9))
+    
+    def test_generate_iter(self):
+        """Test streamed WAV bytes match the file written by generate."""
+        import io
+        from scipy.io import wavfile
+        
+        # At this volume the peak bound is below full scale, so the stream and
+        # the file share a scale and differ only by sine recurrence rounding
+        volume = 0.5
+        audio_file = self.generator.generate(self.test_frequency, self.test_duration, volume)
+        _, expected = wavfile.read(audio_file)
+        
+        with patch.object(self.generator, '_render') as render:
+            chunks = list(self.generator.generate_iter(
+                self.test_frequency, self.test_duration, volume, chunk_sec=0.3
+            ))
+        render.assert_not_called()  # Synthesized chunk by chunk
+        self.assertEqual(len(chunks[0]), 44)  # WAV header comes first
+        self.assertEqual(len(chunks), 1 + 4)
+        
+        sample_rate, audio = wavfile.read(io.BytesIO(b''.join(chunks)))
+        self.assertEqual(sample_rate, self.generator.sample_rate)
+        self.assertEqual(audio.shape, expected.shape)
+        np.testing.assert_allclose(audio, expected, atol=1)
+    
+    def test_generate_iter_transition(self):
+        """Test streams with a transition are scaled by the peak bound without clipping."""
+        import io
+        from scipy.io import wavfile
+        
+        audio_file = self.generator.generate(self.test_frequency, 2.0, previous_frequency=6.0)
+        _, expected = wavfile.read(audio_file)
+        
+        chunks = self.generator.generate_iter(self.test_frequency, 2.0,
+                                              previous_frequency=6.0, chunk_sec=0.3)
+        _, audio = wavfile.read(io.BytesIO(b''.join(chunks)))
+        self.assertEqual(audio.shape, expected.shape)
+        
+        # The bound is at least the true peak, so the stream is never louder
+        self.assertLessEqual(np.max(np.abs(audio)), np.max(np.abs(expected)) + 1)
+        np.testing.assert_array_equal(audio[0], [0, 0])
+        np.testing.assert_array_equal(audio[-1], [0, 0])
+        self.assertGreater(np.max(np.abs(audio)), 0)
+    
+    def test_apply_fade(self):
+        """Test fades ramp audio in and out without touching the middle."""
+        audio = np.ones(self.generator.sample_rate, dtype=np.float32)
+        faded = self.generator.apply_fade(audio)
+        fade_length = int(0.1 * self.generator.sample_rate)
+        
+        self.assertEqual(faded[0], 0.0)
+        self.assertEqual(faded[-1], 0.0)
+        np.testing.assert_array_equal(faded[fade_length:-fade_length], 1.0)
+        
+        # Non-default fade lengths are supported
+        short = self.generator.apply_fade(np.ones(1000, dtype=np.float32), fade_duration=0.01)
+        self.assertEqual(short[0], 0.0)
+        self.assertEqual(short[500], 1.0)
+    
+    def test_cleanup_old_files(self):
+        """Test only files older than the age limit are removed."""
+        import os
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as audio_dir:
+            self.app.config['AUDIO_UPLOAD_FOLDER'] = audio_dir
+            old_file = os.path.join(audio_dir, 'old.wav')
+            open(old_file, 'w').close()
+            os.mkdir(os.path.join(audio_dir, 'subdir'))
             
-            # Generate second audio with transition
-            mock_temp.return_value.name = '/tmp/test2.wav'
-            audio_file = self.generator.generate(4.0, 2.0)  # Theta
+            # Nothing is old enough yet
+            self.generator.cleanup_old_files(max_age_hours=1)
+            self.assertTrue(os.path.exists(old_file))
             
-            # Check that transition was used
-            self.assertEqual(self.generator._last_frequency, 4.0)
+            # Negative age limit treats every file as expired
+            self.generator.cleanup_old_files(max_age_hours=-1)
+            self.assertFalse(os.path.exists(old_file))
+            self.assertTrue(os.path.isdir(os.path.join(audio_dir, 'subdir')))
     
     def test_optimal_carrier_frequency(self):
         """Test carrier frequency optimization for different ranges."""
@@ -87,6 +333,11 @@ class TestAudioGenerator(unittest.TestCase):
         self.assertEqual(self.generator.get_optimal_carrier_frequency(6.0), 200.0)   # Theta
         self.assertEqual(self.generator.get_optimal_carrier_frequency(10.0), 440.0)  # Alpha
         self.assertEqual(self.generator.get_optimal_carrier_frequency(40.0), 500.0)  # Gamma
+        
+        # Vectorized lookup must agree with the scalar ladder, including band edges
+        targets = np.array([0.5, 2.0, 4.0, 4.5, 6.0, 8.0, 10.0, 14.0, 14.5, 40.0])
+        expected = [self.generator.get_optimal_carrier_frequency(f) for f in targets]
+        np.testing.assert_array_equal(self.generator._carriers_vec(targets), expected)
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,7 +4,7 @@ Unit tests for harmonic relationship calculations and overtone generation.
 import unittest
 import numpy as np
 import logging
-from .harmonics import HarmonicCalculator, HarmonicOvertoneGenerator
+from .harmonics import HarmonicCalculator, HarmonicOvertoneGenerator, _two_pi_t
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -31,6 +31,15 @@ class TestHarmonicCalculator(unittest.TestCase):
         self.assertAlmostEqual(harmonic, self.base_freq * 1.5, places=1)  # Perfect fifth
         self.assertEqual(ratio, 1.5)
     
+    def test_find_nearest_harmonic_batch(self):
+        """Test batched harmonic matching agrees with the scalar version."""
+        targets = np.array([100.0, 145.0, 190.0, 131.0, 121.0])
+        harmonics, ratios = self.calculator.find_nearest_harmonic_batch(self.base_freq, targets)
+        
+        for target, harmonic, ratio in zip(targets, harmonics, ratios):
+            expected = self.calculator.find_nearest_harmonic(self.base_freq, target)
+            self.assertEqual((harmonic, ratio), expected)
+    
     def test_calculate_harmonic_series(self):
         """Test harmonic series calculation."""
         harmonics = self.calculator.calculate_harmonic_series(
@@ -147,6 +156,9 @@ class TestHarmonicCalculator(unittest.TestCase):
                 msg=f"Carrier frequency not optimal for {target_freq}Hz"
             )
         
+        # Targets that round to a core frequency use its default carrier
+        self.assertEqual(self.calculator.optimize_carrier_frequency(6.004), 288.0)
+        
         # Test additional cases (verify harmonic relationships)
         for target_freq, min_carrier, max_carrier in additional_test_cases:
             carrier = self.calculator.optimize_carrier_frequency(
@@ -212,16 +224,17 @@ class TestHarmonicOvertoneGenerator(unittest.TestCase):
         # Check basic properties
         expected_samples = int(self.sample_rate * self.test_duration)
         self.assertEqual(len(audio), expected_samples)
+        self.assertEqual(audio.dtype, np.float32)
         
         # Check amplitude is within bounds
         self.assertLessEqual(np.max(np.abs(audio)), 1.0)
         
         # Perform FFT to verify frequency content
-        fft = np.fft.fft(audio)
-        freqs = np.fft.fftfreq(len(audio), 1/self.sample_rate)
+        fft = np.fft.rfft(audio)
+        bin_of = lambda f: int(round(f * len(audio) / self.sample_rate))
         
         # Check for presence of fundamental
-        fundamental_idx = np.argmin(np.abs(freqs - self.test_frequency))
+        fundamental_idx = bin_of(self.test_frequency)
         self.assertGreater(np.abs(fft[fundamental_idx]), 0)
         
         # Check for presence of harmonics
@@ -230,7 +243,7 @@ class TestHarmonicOvertoneGenerator(unittest.TestCase):
             if harmonic_freq > self.generator.safety_limits['max_frequency']:
                 break
             
-            harmonic_idx = np.argmin(np.abs(freqs - harmonic_freq))
+            harmonic_idx = bin_of(harmonic_freq)
             self.assertGreater(np.abs(fft[harmonic_idx]), 0)
             
     def test_generate_enhanced_frequency(self):
@@ -250,20 +263,38 @@ class TestHarmonicOvertoneGenerator(unittest.TestCase):
         self.assertLessEqual(np.max(np.abs(audio)), 1.0)
         
         # Perform FFT to verify frequency content
-        fft = np.fft.fft(audio)
-        freqs = np.fft.fftfreq(len(audio), 1/self.sample_rate)
+        fft = np.fft.rfft(audio)
+        bin_of = lambda f: int(round(f * len(audio) / self.sample_rate))
         
         # Get carrier frequency
         carrier = self.generator.calculator.optimize_carrier_frequency(self.test_frequency)
         
         # Check for presence of carrier and its harmonics
-        carrier_idx = np.argmin(np.abs(freqs - carrier))
+        carrier_idx = bin_of(carrier)
         self.assertGreater(np.abs(fft[carrier_idx]), 0)
         
         # Check for presence of target frequency and its harmonics
-        target_idx = np.argmin(np.abs(freqs - self.test_frequency))
+        target_idx = bin_of(self.test_frequency)
         self.assertGreater(np.abs(fft[target_idx]), 0)
         
+    def test_overtone_table(self):
+        """Test overtone partials follow the decay and safety limits."""
+        freqs, amps = self.generator.overtone_table(self.test_frequency, base_amplitude=0.5)
+        
+        self.assertEqual(freqs[0], self.test_frequency)
+        self.assertEqual(amps[0], 0.5)
+        np.testing.assert_allclose(freqs, self.test_frequency * np.arange(1, len(freqs) + 1))
+        np.testing.assert_allclose(amps[1:] / amps[:-1], self.generator.safety_limits['amplitude_decay'])
+        self.assertTrue(np.all(amps >= self.generator.safety_limits['min_amplitude']))
+        self.assertTrue(np.all(freqs <= self.generator.safety_limits['max_frequency']))
+        
+    def test_time_axis_cache(self):
+        """Test the 2*pi*t axis is shared between calls and read-only."""
+        two_pi_t = _two_pi_t(self.sample_rate, self.test_duration)
+        self.assertIs(two_pi_t, _two_pi_t(self.sample_rate, self.test_duration))
+        self.assertFalse(two_pi_t.flags.writeable)
+        np.testing.assert_allclose(two_pi_t[:3], 2 * np.pi * np.arange(3) / self.sample_rate)
+        
     def test_safety_limits(self):
         """Test safety limits for overtone generation."""
         # Test maximum frequency limit
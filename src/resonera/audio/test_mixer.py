@@ -107,6 +107,22 @@ class TestBackgroundSoundMixer(unittest.TestCase):
         # Check that it's roughly centered around zero
         self.assertAlmostEqual(np.mean(noise), 0, places=2)
         
+    def test_float32_generation(self):
+        """Test backgrounds can be generated directly in float32."""
+        noise = self.mixer.generate_white_noise(self.test_duration, dtype=np.float32)
+        drone = self.mixer.generate_ambient_drone(self.test_duration, dtype=np.float32)
+        expected = self.mixer.generate_ambient_drone(self.test_duration)
+        
+        self.assertEqual(noise.dtype, np.float32)
+        self.assertEqual(drone.dtype, np.float32)
+        np.testing.assert_allclose(drone, expected, atol=1e-6)
+        
+    def test_white_noise_odd_length(self):
+        """Test white noise keeps an odd sample count through the FFT shaping."""
+        duration = (self.sample_rate + 1) / self.sample_rate
+        noise = self.mixer.generate_white_noise(duration)
+        self.assertEqual(len(noise), int(self.sample_rate * duration))
+        
     def test_ambient_drone_generation(self):
         """Test ambient drone background generation."""
         volume = 0.1
@@ -130,8 +146,7 @@ class TestBackgroundSoundMixer(unittest.TestCase):
         
         # Verify presence of base frequency using FFT
         fft = np.fft.rfft(drone)
-        freqs = np.fft.rfftfreq(len(drone), 1/self.sample_rate)
-        base_idx = np.argmin(np.abs(freqs - base_freq))
+        base_idx = int(round(base_freq * len(drone) / self.sample_rate))
         self.assertTrue(np.abs(fft[base_idx]) > 0)
         
     def test_background_mixing_mono(self):
@@ -23,6 +23,7 @@ class TestFrequencyTransition(unittest.TestCase):
         
         # Check array properties
         self.assertEqual(len(frequencies), self.expected_samples)
+        self.assertEqual(frequencies.dtype, np.float32)
         self.assertAlmostEqual(frequencies[0], self.start_freq)
         self.assertAlmostEqual(frequencies[-1], self.end_freq)
         
@@ -78,6 +79,16 @@ class TestFrequencyTransition(unittest.TestCase):
             places=1
         )
     
+    def test_transition_cache(self):
+        """Test identical transitions share one read-only array."""
+        for method in (self.transition.linear_transition,
+                       self.transition.exponential_transition,
+                       self.transition.sigmoid_transition):
+            frequencies = method(self.start_freq, self.end_freq, self.duration)
+            self.assertIs(method(self.start_freq, self.end_freq, self.duration), frequencies)
+            with self.assertRaises(ValueError):
+                frequencies[0] = 0.0
+    
     def test_optimal_duration(self):
         """Test optimal duration calculation."""
         # Small frequency change
@@ -91,6 +102,14 @@ class TestFrequencyTransition(unittest.TestCase):
         # Large frequency change
         duration = self.transition.calculate_optimal_duration(10.0, 40.0)
         self.assertEqual(duration, 20.0)
+        
+        # Vectorized lookup must agree with the scalar ladder, including edges
+        starts = np.array([10.0, 10.0, 10.0, 10.0, 10.0, 12.0, 40.0])
+        ends = np.array([10.0, 11.5, 12.0, 14.0, 15.0, 10.0, 10.0])
+        expected = [self.transition.calculate_optimal_duration(s, e) for s, e in zip(starts, ends)]
+        np.testing.assert_array_equal(
+            self.transition.calculate_optimal_durations(starts, ends), expected
+        )
     
     def test_transition_points(self):
         """Test transition points calculation."""
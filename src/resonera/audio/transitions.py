@@ -1,17 +1,105 @@
 """
 Frequency transition algorithms for smooth brainwave state changes.
 """
+import functools
 import numpy as np
 from typing import List, Tuple
 
+
+@functools.lru_cache(maxsize=32)
+def _unit_ramp(num_steps: int) -> np.ndarray:
+    """
+    Return a cached, read-only float32 ramp from 0 to 1 over num_steps.
+    
+    Transitions scale and shift it into a new array, which is cheaper than
+    np.linspace building a float64 ramp and casting it.
+    """
+    ramp = np.linspace(0, 1, num_steps, dtype=np.float32)
+    ramp.setflags(write=False)
+    return ramp
+
+
+@functools.lru_cache(maxsize=8)
+def _sigmoid_shape(num_steps: int, smoothness: float) -> np.ndarray:
+    """Return a cached, read-only sigmoid rising from exactly 0 to 1 over num_steps."""
+    # Evaluate 1 / (1 + exp(-t)) for t in [-smoothness/2, smoothness/2] and
+    # normalize it in place in one buffer
+    sigmoid = _unit_ramp(num_steps) * smoothness
+    sigmoid -= smoothness / 2
+    np.negative(sigmoid, out=sigmoid)
+    np.exp(sigmoid, out=sigmoid)
+    sigmoid += 1
+    np.reciprocal(sigmoid, out=sigmoid)
+    low, high = sigmoid[0], sigmoid[-1]
+    sigmoid -= low
+    sigmoid /= high - low
+    sigmoid.setflags(write=False)
+    return sigmoid
+
+
+# Transition curves are pure functions of their parameters, so identical
+# transitions share one cached, read-only array
+
+@functools.lru_cache(maxsize=8)
+def _linear_transition(sample_rate: int, start_freq: float, end_freq: float,
+                       duration: float) -> np.ndarray:
+    num_steps = int(sample_rate * duration)
+    frequencies = _unit_ramp(num_steps) * (end_freq - start_freq)
+    frequencies += start_freq
+    frequencies.setflags(write=False)
+    return frequencies
+
+
+@functools.lru_cache(maxsize=8)
+def _exponential_transition(sample_rate: int, start_freq: float, end_freq: float,
+                            duration: float, curve: float) -> np.ndarray:
+    num_steps = int(sample_rate * duration)
+    t = _unit_ramp(num_steps)
+    
+    # Create exponential curve; the default quadratic curve skips libm pow
+    frequencies = np.square(t) if curve == 2.0 else np.power(t, curve)
+    
+    # Map to frequency range in place
+    frequencies *= end_freq - start_freq
+    frequencies += start_freq
+    frequencies.setflags(write=False)
+    return frequencies
+
+
+@functools.lru_cache(maxsize=8)
+def _sigmoid_transition(sample_rate: int, start_freq: float, end_freq: float,
+                        duration: float, smoothness: float) -> np.ndarray:
+    num_steps = int(sample_rate * duration)
+    
+    # Sigmoid curve normalized to [0,1]; the shape depends only on the
+    # length and steepness, so transitions between other frequencies reuse it
+    sigmoid = _sigmoid_shape(num_steps, smoothness)
+    
+    # Map sigmoid [0,1] to frequency range with a single new array
+    frequencies = sigmoid * (end_freq - start_freq)
+    frequencies += start_freq
+    frequencies.setflags(write=False)
+    return frequencies
+
+
 class FrequencyTransition:
-    """Handles smooth transitions between different brainwave frequencies."""
+    """
+    Handles smooth transitions between different brainwave frequencies.
+    
+    Transition curves are cached and shared between calls, so they are
+    returned read-only; copy one before modifying it.
+    """
+    
+    # Transition duration for each size of frequency change, looked up by the
+    # change's position among the edges (see calculate_optimal_duration)
+    DURATION_CHANGE_EDGES = np.array([2.0, 5.0])
+    DURATIONS = np.array([5.0, 10.0, 20.0])
     
     def __init__(self, sample_rate: int = 44100):
         self.sample_rate = sample_rate
     
     def linear_transition(self, start_freq: float, end_freq: float,
-                         duration: float) -> List[float]:
+                         duration: float) -> np.ndarray:
         """
         Create a linear frequency transition.
         
@@ -21,13 +109,13 @@ class FrequencyTransition:
             duration: Transition duration in seconds
             
         Returns:
-            List[float]: Array of frequencies for each time step
+            numpy.ndarray: float32 frequency for each time step
         """
-        num_steps = int(self.sample_rate * duration)
-        return np.linspace(start_freq, end_freq, num_steps)
+        return _linear_transition(self.sample_rate, float(start_freq),
+                                  float(end_freq), float(duration))
     
     def exponential_transition(self, start_freq: float, end_freq: float,
-                             duration: float, curve: float = 2.0) -> List[float]:
+                             duration: float, curve: float = 2.0) -> np.ndarray:
         """
         Create an exponential frequency transition for more natural changes.
         
@@ -38,19 +126,13 @@ class FrequencyTransition:
             curve: Exponential curve factor (higher = steeper curve)
             
         Returns:
-            List[float]: Array of frequencies for each time step
+            numpy.ndarray: float32 frequency for each time step
         """
-        num_steps = int(self.sample_rate * duration)
-        t = np.linspace(0, 1, num_steps)
-        
-        # Create exponential curve
-        curve_factor = np.power(t, curve)
-        
-        # Map to frequency range
-        return start_freq + (end_freq - start_freq) * curve_factor
+        return _exponential_transition(self.sample_rate, float(start_freq),
+                                       float(end_freq), float(duration), float(curve))
     
     def sigmoid_transition(self, start_freq: float, end_freq: float,
-                         duration: float, smoothness: float = 6.0) -> List[float]:
+                         duration: float, smoothness: float = 6.0) -> np.ndarray:
         """
         Create a sigmoid frequency transition for smooth acceleration/deceleration.
         
@@ -61,17 +143,10 @@ class FrequencyTransition:
             smoothness: Controls the steepness of the sigmoid curve
             
         Returns:
-            List[float]: Array of frequencies for each time step
+            numpy.ndarray: float32 frequency for each time step
         """
-        num_steps = int(self.sample_rate * duration)
-        t = np.linspace(-smoothness/2, smoothness/2, num_steps)
-        
-        # Create sigmoid curve normalized to [0,1]
-        sigmoid = 1 / (1 + np.exp(-t))
-        sigmoid = (sigmoid - sigmoid[0]) / (sigmoid[-1] - sigmoid[0])
-        
-        # Map sigmoid [0,1] to frequency range
-        return start_freq + (end_freq - start_freq) * sigmoid
+        return _sigmoid_transition(self.sample_rate, float(start_freq),
+                                   float(end_freq), float(duration), float(smoothness))
     
     def calculate_optimal_duration(self, start_freq: float,
                                  end_freq: float) -> float:
@@ -95,6 +170,21 @@ class FrequencyTransition:
         else:
             return 20.0  # Large changes: 20 seconds
     
+    def calculate_optimal_durations(self, start_freqs: np.ndarray,
+                                    end_freqs: np.ndarray) -> np.ndarray:
+        """
+        Vectorized calculate_optimal_duration for arrays of transitions.
+        
+        Args:
+            start_freqs: Starting frequency of each transition in Hz
+            end_freqs: Target frequency of each transition in Hz
+            
+        Returns:
+            numpy.ndarray: Recommended duration of each transition in seconds
+        """
+        freq_diffs = np.abs(np.asarray(end_freqs) - np.asarray(start_freqs))
+        return self.DURATIONS[np.searchsorted(self.DURATION_CHANGE_EDGES, freq_diffs, side='right')]
+    
     def get_transition_points(self, frequencies: List[float],
                             timestamps: List[float]) -> List[Tuple[float, float, float]]:
         """
@@ -110,11 +200,9 @@ class FrequencyTransition:
         if len(frequencies) != len(timestamps):
             raise ValueError("frequencies and timestamps must have same length")
         
-        transitions = []
-        for i in range(len(frequencies) - 1):
-            start_time = timestamps[i]
-            end_time = timestamps[i + 1]
-            duration = end_time - start_time
-            transitions.append((start_time, end_time, duration))
+        # Each transition runs from one timestamp to the next
+        times = np.asarray(timestamps, dtype=np.float64)
+        start_times, end_times = times[:-1], times[1:]
+        durations = end_times - start_times
         
-        return transitions
+        return list(zip(start_times.tolist(), end_times.tolist(), durations.tolist()))
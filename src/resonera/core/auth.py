@@ -0,0 +1,19 @@
+"""
+Authentication helpers shared by the route blueprints.
+"""
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+
+def current_user_id() -> int:
+    """
+    Return the authenticated user's ID for the current request.
+    
+    The JWT subject is parsed once per request and kept on `g`. Must be
+    called from a view protected by `jwt_required`.
+    
+    Returns:
+        int: ID of the user the access token was issued to
+    """
+    if 'user_id' not in g:
+        g.user_id = int(get_jwt_identity())
+    return g.user_id
@@ -0,0 +1,73 @@
+"""
+Revoked JWT tracking for the Resonera application.
+"""
+import threading
+import time
+from typing import Optional
+
+try:
+    import redis
+except ImportError:  # Redis is optional; fall back to per-process storage
+    redis = None
+
+class TokenBlocklist:
+    """
+    Set of revoked access token IDs (jti).
+    
+    With REDIS_URL configured, revocations live in Redis so every worker
+    sees them; each entry expires when its token would have. Otherwise they
+    are kept in this process only, which suits development and tests.
+    """
+    
+    KEY_PREFIX = 'jwt:revoked:'
+    
+    def __init__(self):
+        self._redis = None
+        self._local = {}  # jti -> expiry (unix time)
+        self._lock = threading.Lock()
+    
+    def init_app(self, app):
+        """Connect to Redis if the app configures REDIS_URL."""
+        url = app.config.get('REDIS_URL')
+        if url and redis is not None:
+            self._redis = redis.Redis.from_url(url)
+        elif url:
+            app.logger.warning('REDIS_URL is set but redis is not installed; '
+                               'revoked tokens are tracked per process')
+    
+    def revoke(self, jti: str, expires_at: int) -> None:
+        """
+        Revoke a token until it expires.
+        
+        Args:
+            jti: The token's unique ID claim
+            expires_at: The token's exp claim (unix time)
+        """
+        ttl = max(int(expires_at - time.time()), 1)
+        if self._redis is not None:
+            self._redis.set(self.KEY_PREFIX + jti, 1, ex=ttl)
+            return
+        
+        now = time.time()
+        with self._lock:
+            for stale in [k for k, t in self._local.items() if t <= now]:
+                del self._local[stale]
+            self._local[jti] = now + ttl
+    
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Check whether a token has been revoked.
+        
+        Args:
+            jti: The token's unique ID claim
+        
+        Returns:
+            bool: True if the token must be rejected
+        """
+        if self._redis is not None:
+            return bool(self._redis.exists(self.KEY_PREFIX + jti))
+        
+        expires: Optional[float] = self._local.get(jti)
+        return expires is not None and expires > time.time()
+
+blocklist = TokenBlocklist()
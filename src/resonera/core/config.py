@@ -15,13 +15,21 @@ class Config:
     JWT_IDENTITY_CLAIM = 'sub'
     JWT_ERROR_MESSAGE_KEY = 'msg'
     
+    # Shared revoked-token store; unset keeps revocations per process
+    REDIS_URL = os.environ.get('REDIS_URL')
+    
     # Database
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///resonera.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Schema comes from `flask db upgrade`; enable only for throwaway dev databases
+    CREATE_ALL_ON_STARTUP = os.environ.get('CREATE_ALL_ON_STARTUP', '').lower() in ('1', 'true')
     
     # Audio settings
     AUDIO_UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'audio_files')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    # Render processes per server process, and Numba threads in each
+    RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', 2))
+    RENDER_THREADS = int(os.environ.get('RENDER_THREADS', 2))
     
     # Safety settings
     MAX_FREQUENCY = 100  # Maximum frequency in Hz
@@ -1,18 +1,77 @@
 """
 Email functionality for the Resonera application.
 """
+import atexit
+import functools
+import logging
 import smtplib
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Optional, List
 import os
 from .config import Config
 
+logger = logging.getLogger(__name__)
+
 class EmailSender:
     """Handles email sending functionality using MIME."""
     
-    @staticmethod
+    # One authenticated connection shared by all sends; smtplib connections
+    # are not thread-safe, so the lock is held for each whole send
+    _smtp: Optional[smtplib.SMTP] = None
+    _smtp_lock = threading.Lock()
+    
+    @classmethod
+    def _get_smtp(cls) -> smtplib.SMTP:
+        """
+        Return the shared SMTP connection, opening it if needed.
+        
+        An existing connection is checked with NOOP and replaced if the
+        server has dropped it. Callers must hold _smtp_lock.
+        """
+        if cls._smtp is not None:
+            try:
+                if cls._smtp.noop()[0] == 250:
+                    return cls._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            cls._discard_smtp()
+        
+        logger.debug("Establishing SMTP connection")
+        server = smtplib.SMTP('smtp.gmail.com', 587)
+        try:
+            server.starttls()
+            server.login(Config.EMAIL_USER, Config.EMAIL_PASSWORD)
+        except BaseException:
+            server.close()
+            raise
+        logger.debug("SMTP connection ready")
+        
+        cls._smtp = server
+        return server
+    
+    @classmethod
+    def _discard_smtp(cls) -> None:
+        """Drop the shared connection without talking to the server."""
+        if cls._smtp is not None:
+            cls._smtp.close()
+            cls._smtp = None
+    
+    @classmethod
+    def close(cls) -> None:
+        """Close the shared SMTP connection, if one is open."""
+        with cls._smtp_lock:
+            if cls._smtp is not None:
+                try:
+                    cls._smtp.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                cls._discard_smtp()
+    
+    @classmethod
     def send_email(
+        cls,
         to_addresses: List[str],
         subject: str,
         text_content: str,
@@ -46,39 +105,33 @@ class EmailSender:
                 html_part = MIMEText(html_content, 'html')
                 msg.attach(html_part)
             
-            print("Establishing SMTP connection...")
-            with smtplib.SMTP('smtp.gmail.com', 587) as server:
-                print("✓ SMTP connection established")
-                
-                print("Starting TLS...")
-                server.starttls()
-                print("✓ TLS started")
-                
-                print("Attempting login...")
-                server.login(Config.EMAIL_USER, Config.EMAIL_PASSWORD)
-                print("✓ Login successful")
-                
-                print("Sending message...")
-                server.send_message(msg)
-                print("✓ Message sent")
+            with cls._smtp_lock:
+                try:
+                    cls._get_smtp().send_message(msg)
+                except BaseException:
+                    # The connection may be mid-transaction; start fresh next time
+                    cls._discard_smtp()
+                    raise
+            logger.debug("Message sent")
                 
             return True
             
         except smtplib.SMTPAuthenticationError as e:
-            print(f"Authentication failed: {str(e)}")
-            print(f"Using email: {Config.EMAIL_USER}")
-            print("Note: Password length:", len(Config.EMAIL_PASSWORD) if Config.EMAIL_PASSWORD else 0)
+            logger.error("SMTP authentication failed for %s: %s", Config.EMAIL_USER, e)
             return False
         except Exception as e:
-            print(f"Error sending email: {str(e)}")
-            print(f"Error type: {type(e).__name__}")
+            logger.error("Error sending email (%s): %s", type(e).__name__, e)
             return False
 
     @staticmethod
+    @functools.lru_cache(maxsize=64)
     def load_template(template_name: str) -> tuple[str, str]:
         """
         Load an email template from the templates directory.
         
+        Templates are read from disk once per process and then served from
+        memory, so edits take effect after a restart.
+        
         Args:
             template_name: Name of the template file (without extension)
             
@@ -100,3 +153,6 @@ class EmailSender:
                 html_content = f.read()
                 
         return text_content, html_content
+
+
+atexit.register(EmailSender.close)
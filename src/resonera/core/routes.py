@@ -1,112 +1,208 @@
 """
 Core routes for authentication and user management.
 """
+import hashlib
+import hmac
+import threading
+import time
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_jwt_extended import create_access_token, get_jwt, jwt_required
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import check_password_hash
 from ..database import db, User
+from .auth import current_user_id
+from .blocklist import blocklist
 
 bp = Blueprint('core', __name__)
 
+_REGISTER_REQUIRED = frozenset({'username', 'email', 'password'})
+_PROFILE_UPDATE_FIELDS = (
+    'max_frequency', 'volume_preference',
+    'has_medical_condition', 'emergency_contact'
+)
+
+# argon2id, tuned to roughly 40 MB and 50 ms per verification
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=40960, parallelism=1)
+
+def _hash_password(password):
+    """Hash a password with argon2id."""
+    return _password_hasher.hash(password)
+
+def _check_password(password_hash, password):
+    """Check a password against an argon2id or legacy werkzeug hash."""
+    if not password_hash.startswith('$argon2'):
+        return check_password_hash(password_hash, password)
+    try:
+        return _password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def _needs_rehash(password_hash):
+    """Return True if a stored hash is legacy or uses outdated parameters."""
+    return (not password_hash.startswith('$argon2')
+            or _password_hasher.check_needs_rehash(password_hash))
+
+# Verified against when the username is unknown, so that a login for a
+# missing user takes as long as one with a wrong password
+_DUMMY_HASH = _hash_password('x' * 16)
+
+# Recently verified logins, so repeat logins skip the slow password hash.
+# Keys are HMACs of (user id, stored hash, password) under the app secret,
+# never raw passwords; a changed password changes the key.
+_LOGIN_CACHE_TTL = 30  # seconds
+_LOGIN_CACHE_MAX = 10000
+_verified_logins = {}  # key -> expiry (time.monotonic())
+_verified_logins_lock = threading.Lock()
+
+def _login_key(user, password):
+    """Return the cache key for a user and candidate password."""
+    message = f'{user.id}:{user.password_hash}:{password}'.encode()
+    secret = current_app.config['SECRET_KEY'].encode()
+    return hmac.new(secret, message, hashlib.sha256).hexdigest()
+
+def _verify_login(user, password):
+    """Check a password, consulting the short-lived login cache first."""
+    key = _login_key(user, password)
+    now = time.monotonic()
+    with _verified_logins_lock:
+        expires = _verified_logins.get(key)
+    if expires is not None and expires > now:
+        return True
+    
+    if not _check_password(user.password_hash, password):
+        return False
+    
+    # Upgrade legacy hashes now that the plaintext is known to be correct
+    if _needs_rehash(user.password_hash):
+        user.password_hash = _hash_password(password)
+        db.session.commit()
+        key = _login_key(user, password)
+    
+    with _verified_logins_lock:
+        if len(_verified_logins) >= _LOGIN_CACHE_MAX:
+            for stale in [k for k, t in _verified_logins.items() if t <= now]:
+                del _verified_logins[stale]
+            if len(_verified_logins) >= _LOGIN_CACHE_MAX:
+                _verified_logins.clear()
+        _verified_logins[key] = now + _LOGIN_CACHE_TTL
+    return True
+
 @bp.route('/register', methods=['POST'])
 def register():
     """Register a new user."""
     data = request.get_json()
     
     # Validate required fields
-    required_fields = ['username', 'email', 'password']
-    if not all(field in data for field in required_fields):
+    if not _REGISTER_REQUIRED.issubset(data):
         return jsonify({'error': 'Missing required fields'}), 400
     
-    # Check if user already exists
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already exists'}), 400
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already exists'}), 400
-    
-    # Create new user
+    # Create new user; the unique indexes reject duplicates atomically
     user = User(
         username=data['username'],
         email=data['email'],
-        password_hash=generate_password_hash(data['password']),
+        password_hash=_hash_password(data['password']),
         has_medical_condition=data.get('has_medical_condition', False),
         emergency_contact=data.get('emergency_contact')
     )
     
     db.session.add(user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        
+        # Find out which field clashed, both in one query; with no clash the
+        # row broke another constraint, such as a null username or email
+        existing = User.query.with_entities(User.username).filter(
+            or_(User.username == data['username'], User.email == data['email'])
+        ).first()
+        if existing is None:
+            return jsonify({'error': 'Invalid registration details'}), 400
+        if existing.username == data['username']:
+            return jsonify({'error': 'Username already exists'}), 409
+        return jsonify({'error': 'Email already exists'}), 409
     
     return jsonify({'message': 'User registered successfully'}), 201
 
 @bp.route('/login', methods=['POST'])
 def login():
     """Authenticate user and return JWT token."""
-    data = request.get_json()
+    data = request.get_json(silent=True)
     
     # Validate required fields
-    if not data.get('username') or not data.get('password'):
+    if not data or not data.get('username') or not data.get('password'):
         return jsonify({'error': 'Missing username or password'}), 400
     
     # Find and validate user
     user = User.query.filter_by(username=data['username']).first()
-    if not user or not check_password_hash(user.password_hash, data['password']):
+    if not user:
+        _check_password(_DUMMY_HASH, data['password'])
+        return jsonify({'error': 'Invalid username or password'}), 401
+    if not _verify_login(user, data['password']):
         return jsonify({'error': 'Invalid username or password'}), 401
     
-    # Create access token with string ID
+    # JWT subjects must be strings; current_user_id() converts back once per request
     access_token = create_access_token(identity=str(user.id))
-    current_app.logger.info(f'User {user.username} logged in successfully')
+    current_app.logger.info('User %s logged in successfully', user.username)
     return jsonify({
         'access_token': access_token,
         'token_type': 'Bearer',
         'user_id': user.id
     }), 200
 
+@bp.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    """Revoke the current access token."""
+    token = get_jwt()
+    blocklist.revoke(token['jti'], token['exp'])
+    return jsonify({'message': 'Logged out successfully'}), 200
+
 @bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     """Get current user's profile."""
     try:
-        user_id = int(get_jwt_identity())
-        current_app.logger.info(f'Fetching profile for user ID: {user_id}')
+        user_id = current_user_id()
+        current_app.logger.info('Fetching profile for user ID: %s', user_id)
         
-        user = User.query.get(user_id)
-        if not user:
-            current_app.logger.error(f'User ID {user_id} not found in database')
+        # Fetch only the profile columns, not the password hash
+        profile = User.query.with_entities(
+            User.username,
+            User.email,
+            User.max_frequency,
+            User.volume_preference,
+            User.has_medical_condition,
+            User.emergency_contact
+        ).filter_by(id=user_id).first()
+        if not profile:
+            current_app.logger.error('User ID %s not found in database', user_id)
             return jsonify({'error': 'User not found'}), 404
         
-        return jsonify({
-            'username': user.username,
-            'email': user.email,
-            'max_frequency': user.max_frequency,
-            'volume_preference': user.volume_preference,
-            'has_medical_condition': user.has_medical_condition,
-            'emergency_contact': user.emergency_contact
-        }), 200
+        return jsonify(profile._asdict()), 200
     except Exception as e:
-        current_app.logger.error(f'Error fetching profile: {str(e)}')
+        current_app.logger.error('Error fetching profile: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/profile', methods=['PUT'])
 @jwt_required()
 def update_profile():
     """Update current user's profile."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    
+    user_id = current_user_id()
     data = request.get_json()
     
-    # Update allowed fields
-    allowed_fields = [
-        'max_frequency', 'volume_preference',
-        'has_medical_condition', 'emergency_contact'
-    ]
+    # Update allowed fields with a single UPDATE, without loading the user
+    updates = {field: data[field] for field in _PROFILE_UPDATE_FIELDS if field in data}
+    if updates:
+        found = User.query.filter_by(id=user_id).update(updates, synchronize_session=False)
+    else:
+        found = db.session.query(User.query.filter_by(id=user_id).exists()).scalar()
     
-    for field in allowed_fields:
-        if field in data:
-            setattr(user, field, data[field])
+    if not found:
+        return jsonify({'error': 'User not found'}), 404
     
     db.session.commit()
     
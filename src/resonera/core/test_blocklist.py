@@ -0,0 +1,32 @@
+"""
+Unit tests for revoked token tracking.
+"""
+import time
+import unittest
+from .blocklist import TokenBlocklist
+
+class TestTokenBlocklist(unittest.TestCase):
+    def setUp(self):
+        # No init_app call, so revocations are kept in process
+        self.blocklist = TokenBlocklist()
+    
+    def test_revoke(self):
+        """Test revoked tokens are reported until they expire."""
+        self.assertFalse(self.blocklist.is_revoked('a'))
+        
+        self.blocklist.revoke('a', time.time() + 60)
+        self.assertTrue(self.blocklist.is_revoked('a'))
+        self.assertFalse(self.blocklist.is_revoked('b'))
+    
+    def test_expired_revocation(self):
+        """Test revocations are dropped once the token has expired."""
+        self.blocklist.revoke('a', time.time() + 60)
+        self.blocklist._local['a'] = time.time() - 1
+        self.assertFalse(self.blocklist.is_revoked('a'))
+        
+        # Stale entries are purged on the next revocation
+        self.blocklist.revoke('b', time.time() + 60)
+        self.assertNotIn('a', self.blocklist._local)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,30 +1,74 @@
 """
 Database initialization and models for Resonera.
 """
+import os
+from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from sqlalchemy.sql import func
 
-# Initialize SQLAlchemy instance
+# Initialize SQLAlchemy and migration instances
 db = SQLAlchemy()
+migrate = Migrate()
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+
+# Connection pool for server databases: keep connections open between
+# requests, and drop stale ones before use rather than failing a request.
+# SQLite keeps SQLAlchemy's own pool choice, which these options don't fit.
+POOL_OPTIONS = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_pre_ping': True,
+    'pool_recycle': 1800  # seconds, below typical server idle timeouts
+}
+
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    """
+    Tune each new SQLite connection for concurrent readers.
+    
+    WAL lets readers proceed while a write is in progress, and NORMAL
+    synchronous is durable in WAL mode without an fsync on every commit.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA cache_size=-20000')  # 20 MB page cache
+    cursor.close()
 
 def init_db(app):
-    """Initialize the database with the Flask app."""
+    """
+    Initialize the database with the Flask app.
+    
+    The schema is managed by Alembic migrations (`flask db upgrade`), so
+    startup issues no DDL unless CREATE_ALL_ON_STARTUP is set for local
+    development.
+    """
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', POOL_OPTIONS)
+    app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+    
     db.init_app(app)
+    migrate.init_app(app, db, directory=MIGRATIONS_DIR)
     
     with app.app_context():
-        # Create database tables
-        db.create_all()
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', _set_sqlite_pragma)
         
-        # Log initialization
-        app.logger.info("Database initialized successfully")
-        app.logger.info(f"Database URI: {app.config['SQLALCHEMY_DATABASE_URI']}")
+        if app.config.get('CREATE_ALL_ON_STARTUP'):
+            # Create database tables
+            db.create_all()
+    
+    # Log initialization
+    app.logger.info("Database initialized successfully")
+    app.logger.info(f"Database URI: {app.config['SQLALCHEMY_DATABASE_URI']}")
 
 class User(db.Model):
     """User model for authentication and profile management."""
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    username = db.Column(db.String(80), unique=True, index=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, index=True, nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
     
     # User preferences
@@ -35,6 +79,11 @@ class User(db.Model):
     has_medical_condition = db.Column(db.Boolean, default=False)
     emergency_contact = db.Column(db.String(120))
     
+    # Loaded on access: a user's full history is rarely needed and would
+    # otherwise be fetched on every login. Use selectinload(User.sessions)
+    # when iterating the sessions of many users.
+    sessions = db.relationship('Session', back_populates='user')
+    
     def __repr__(self):
         return f'<User {self.username}>'
 
@@ -50,18 +99,24 @@ class Session(db.Model):
     effectiveness_rating = db.Column(db.Integer)  # User-provided rating
     notes = db.Column(db.Text)
     
+    user = db.relationship('User', back_populates='sessions')
+    # A session's logs load with it, batched in one SELECT ... IN per query
+    safety_logs = db.relationship('SafetyLog', back_populates='session', lazy='selectin')
+    
     def __repr__(self):
         return f'<Session {self.id} for User {self.user_id}>'
 
 class SafetyLog(db.Model):
     """Safety monitoring log for tracking potential issues."""
     id = db.Column(db.Integer, primary_key=True)
-    session_id = db.Column(db.Integer, db.ForeignKey('session.id'), nullable=False)
+    session_id = db.Column(db.Integer, db.ForeignKey('session.id'), index=True, nullable=False)
     timestamp = db.Column(db.DateTime(timezone=True), server_default=func.now())
     event_type = db.Column(db.String(50), nullable=False)
     description = db.Column(db.Text)
     severity = db.Column(db.String(20))  # INFO, WARNING, ERROR
     action_taken = db.Column(db.Text)
     
+    session = db.relationship('Session', back_populates='safety_logs')
+    
     def __repr__(self):
         return f'<SafetyLog {self.id} for Session {self.session_id}>'
@@ -0,0 +1,46 @@
+"""Bring databases created by create_all up to the initial schema
+
+Databases created by db.create_all() before migrations were introduced
+are stamped at 3297f5daefbe (see the setup docs), but they have plain
+UNIQUE constraints instead of the ix_user_* indexes and a 128-character
+password_hash. Each step is skipped where the schema already matches, so
+this is a no-op on databases built by the migrations.
+
+Revision ID: 8eb19f4dca50
+Revises: 3297f5daefbe
+Create Date: 2026-10-15 19:40:12.518304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8eb19f4dca50'
+down_revision = '3297f5daefbe'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    indexes = {index['name'] for index in inspector.get_indexes('user')}
+    password_hash = next(column for column in inspector.get_columns('user')
+                         if column['name'] == 'password_hash')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        if (password_hash['type'].length or 0) < 255:
+            batch_op.alter_column('password_hash',
+                                  existing_type=password_hash['type'],
+                                  type_=sa.String(length=255),
+                                  existing_nullable=False)
+        if 'ix_user_email' not in indexes:
+            batch_op.create_index(batch_op.f('ix_user_email'), ['email'], unique=True)
+        if 'ix_user_username' not in indexes:
+            batch_op.create_index(batch_op.f('ix_user_username'), ['username'], unique=True)
+
+
+def downgrade():
+    # The initial revision also creates these indexes and column type, so
+    # there is nothing to undo that wouldn't break a migrated database
+    pass
@@ -33,6 +33,16 @@ class TestSafetyValidator(unittest.TestCase):
         # Test invalid frequencies
         self.assertFalse(self.validator.validate_frequency(0.1))   # Too low
         self.assertFalse(self.validator.validate_frequency(150.0)) # Too high
+        
+        # Per-user override can lower the maximum but not raise it
+        self.assertFalse(self.validator.validate_frequency(50.0, max_override=40.0))
+        self.assertFalse(self.validator.validate_frequency(150.0, max_override=200.0))
+        
+        # Config changes take effect after refresh()
+        self.app.config['MAX_FREQUENCY'] = 40.0
+        self.assertTrue(self.validator.validate_frequency(50.0))
+        self.validator.refresh()
+        self.assertFalse(self.validator.validate_frequency(50.0))
     
     def test_volume_validation(self):
         """Test volume level validation."""
@@ -45,6 +55,15 @@ class TestSafetyValidator(unittest.TestCase):
         self.assertFalse(self.validator.validate_volume(-0.1))
         self.assertFalse(self.validator.validate_volume(1.1))
     
+    def test_duration_validation(self):
+        """Test session duration validation."""
+        self.assertTrue(self.validator.validate_duration(300))
+        self.assertTrue(self.validator.validate_duration(3600))
+        
+        self.assertFalse(self.validator.validate_duration(0))
+        self.assertFalse(self.validator.validate_duration(-1))
+        self.assertFalse(self.validator.validate_duration(3601))
+    
     def test_session_parameters(self):
         """Test complete session parameter validation."""
         # Test valid parameters
@@ -74,6 +93,26 @@ class TestSafetyValidator(unittest.TestCase):
         self.assertFalse(is_safe)
         self.assertTrue("Frequency" in message)
     
+    def test_batch_validation(self):
+        """Test batch validation agrees with per-segment validation."""
+        frequencies = [10.0, 150.0, 10.0, 10.0, 0.1, 100.0]
+        volumes = [0.7, 0.7, 0.9, 0.7, 1.1, 0.8]
+        durations = [300, 300, 300, 4000, 0, 3600]
+        
+        is_safe, reasons = self.validator.validate_batch(frequencies, volumes, durations)
+        
+        for i, params in enumerate(zip(frequencies, volumes, durations)):
+            expected, _ = self.validator.validate_session_parameters(*params)
+            self.assertEqual(is_safe[i], expected)
+        self.assertEqual(reasons.tolist(), [
+            SafetyValidator.REASON_OK,
+            SafetyValidator.REASON_FREQUENCY,
+            SafetyValidator.REASON_VOLUME,
+            SafetyValidator.REASON_DURATION,
+            SafetyValidator.REASON_FREQUENCY,
+            SafetyValidator.REASON_OK
+        ])
+    
     def test_user_safety(self):
         """Test user-specific safety validation."""
         class MockUser:
@@ -84,14 +123,18 @@ class TestSafetyValidator(unittest.TestCase):
         
         # Test user with medical condition but no emergency contact
         unsafe_user = MockUser(True, None, 40.0)
-        is_safe, message = self.validator.validate_user_safety(unsafe_user)
+        is_safe, message, _ = self.validator.validate_user_safety(unsafe_user)
         self.assertFalse(is_safe)
         self.assertTrue("Emergency contact required" in message)
         
         # Test user with medical condition and emergency contact
         safe_user = MockUser(True, "123-456-7890", 40.0)
-        is_safe, message = self.validator.validate_user_safety(safe_user)
+        is_safe, message, max_frequency = self.validator.validate_user_safety(safe_user)
         self.assertTrue(is_safe)
+        
+        # User limit is returned rather than written into the shared config
+        self.assertEqual(max_frequency, 40.0)
+        self.assertEqual(self.app.config['MAX_FREQUENCY'], 100.0)
 
 if __name__ == '__main__':
     unittest.main()
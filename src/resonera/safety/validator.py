@@ -1,23 +1,65 @@
 """
 Safety validation for audio generation and playback.
 """
+import numpy as np
 from flask import current_app
 
 class SafetyValidator:
     """Validates safety parameters for audio generation."""
     
-    def validate_frequency(self, frequency: float) -> bool:
+    # Failure reason codes returned by validate_batch, in checking order
+    REASON_OK = 0
+    REASON_FREQUENCY = 1
+    REASON_VOLUME = 2
+    REASON_DURATION = 3
+    
+    # Longest session in seconds (1 hour)
+    MAX_DURATION = 3600
+    
+    def __init__(self):
+        # (app, (min_frequency, max_frequency, max_volume)), filled on first use
+        self._cached_limits = None
+    
+    def refresh(self) -> tuple[float, float, float]:
+        """
+        Re-read the safety limits from the current app's config.
+        
+        Call after changing MIN_FREQUENCY, MAX_FREQUENCY or MAX_VOLUME on a
+        running app; limits are otherwise read once per app.
+        
+        Returns:
+            tuple: (min_frequency, max_frequency, max_volume)
+        """
+        app = current_app._get_current_object()
+        limits = (app.config['MIN_FREQUENCY'], app.config['MAX_FREQUENCY'],
+                  app.config['MAX_VOLUME'])
+        self._cached_limits = (app, limits)
+        return limits
+    
+    def _limits(self) -> tuple[float, float, float]:
+        """Return the current app's cached safety limits."""
+        cached = self._cached_limits
+        if cached is None or cached[0] is not current_app._get_current_object():
+            return self.refresh()
+        return cached[1]
+    
+    def validate_frequency(self, frequency: float,
+                           max_override: float = None) -> bool:
         """
         Validate if the requested frequency is within safe range.
         
         Args:
             frequency: The target frequency in Hz
+            max_override: Optional lower per-user maximum in Hz; it can only
+                         tighten the configured maximum, never raise it
             
         Returns:
             bool: True if frequency is safe, False otherwise
         """
-        return (current_app.config['MIN_FREQUENCY'] <= frequency <= 
-                current_app.config['MAX_FREQUENCY'])
+        min_frequency, max_frequency, _ = self._limits()
+        if max_override is not None:
+            max_frequency = min(max_frequency, max_override)
+        return min_frequency <= frequency <= max_frequency
     
     def validate_volume(self, volume: float) -> bool:
         """
@@ -29,7 +71,19 @@ class SafetyValidator:
         Returns:
             bool: True if volume is safe, False otherwise
         """
-        return 0 <= volume <= current_app.config['MAX_VOLUME']
+        return 0 <= volume <= self._limits()[2]
+    
+    def validate_duration(self, duration: float) -> bool:
+        """
+        Validate if the requested session duration is within safe range.
+        
+        Args:
+            duration: Session duration in seconds
+            
+        Returns:
+            bool: True if duration is safe, False otherwise
+        """
+        return 0 < duration <= self.MAX_DURATION
     
     def validate_session_parameters(self, frequency: float, volume: float,
                                   duration: int) -> tuple[bool, str]:
@@ -51,12 +105,45 @@ class SafetyValidator:
         if not self.validate_volume(volume):
             return False, f"Volume level {volume} is outside safe range"
         
-        if duration <= 0 or duration > 3600:  # Max 1 hour
+        if not self.validate_duration(duration):
             return False, f"Duration {duration}s is invalid"
         
         return True, "Parameters validated successfully"
     
-    def validate_user_safety(self, user) -> tuple[bool, str]:
+    def validate_batch(self, frequencies: np.ndarray, volumes: np.ndarray,
+                       durations: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Validate many session segments at once.
+        
+        Applies the same checks as validate_session_parameters to each
+        (frequency, volume, duration) triple.
+        
+        Args:
+            frequencies: Target frequencies in Hz
+            volumes: Target volume levels (0-1)
+            durations: Segment durations in seconds
+            
+        Returns:
+            tuple: (is_safe, reasons) where is_safe is a boolean array and
+                  reasons holds the REASON_* code of the first failed check
+        """
+        frequencies = np.asarray(frequencies)
+        volumes = np.asarray(volumes)
+        durations = np.asarray(durations)
+        min_frequency, max_frequency, max_volume = self._limits()
+        
+        frequency_ok = (frequencies >= min_frequency) & (frequencies <= max_frequency)
+        volume_ok = (volumes >= 0) & (volumes <= max_volume)
+        duration_ok = (durations > 0) & (durations <= self.MAX_DURATION)
+        
+        reasons = np.select(
+            [~frequency_ok, ~volume_ok, ~duration_ok],
+            [self.REASON_FREQUENCY, self.REASON_VOLUME, self.REASON_DURATION],
+            default=self.REASON_OK
+        )
+        return reasons == self.REASON_OK, reasons
+    
+    def validate_user_safety(self, user) -> tuple[bool, str, float]:
         """
         Validate user-specific safety considerations.
         
@@ -64,12 +151,13 @@ class SafetyValidator:
             user: User model instance
             
         Returns:
-            tuple: (is_safe, message) indicating if it's safe for user
+            tuple: (is_safe, message, max_frequency) indicating if it's safe
+                  for user, and the user's effective maximum frequency to
+                  pass to validate_frequency as max_override
         """
+        max_frequency = min(user.max_frequency, self._limits()[1])
+        
         if user.has_medical_condition and not user.emergency_contact:
-            return False, "Emergency contact required for users with medical conditions"
+            return False, "Emergency contact required for users with medical conditions", max_frequency
         
-        if user.max_frequency < current_app.config['MAX_FREQUENCY']:
-            current_app.config['MAX_FREQUENCY'] = user.max_frequency
-            
-        return True, "User safety validated"
+        return True, "User safety validated", max_frequency
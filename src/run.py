@@ -1,20 +1,22 @@
 """
 Main entry point for the Resonera application.
+
+In production, serve the app from its factory with a WSGI server, e.g.:
+
+    gunicorn --chdir src 'resonera:create_app()' -w 4 -k gthread --threads 8
+
+Running this file directly starts Flask's development server instead.
+Nothing happens at import time, so processes that re-import this module
+(such as spawned audio render workers) don't build an app of their own.
 """
-import os
 from resonera import create_app
-from resonera.core.config import Config
 
 def main():
-    """Run the Flask application."""
-    # Create the audio upload directory if it doesn't exist
-    os.makedirs(Config.AUDIO_UPLOAD_FOLDER, exist_ok=True)
-    
-    # Create and configure the app
+    """Run the Flask development server."""
     app = create_app()
-    
-    # Run the app in debug mode for development
-    app.run(debug=True, host='127.0.0.1', port=5000)
+    # Debug mode only for development (FLASK_DEBUG=1), never on a reachable
+    # server; Flask reads FLASK_DEBUG into app.debug when creating the app
+    app.run(debug=app.debug, host='127.0.0.1', port=5000)
 
 if __name__ == '__main__':
     main()